@@ -319,6 +319,15 @@ CREATE INDEX idx_knowledge_base_tags ON agent.knowledge_base USING GIN(tags);
 CREATE INDEX idx_conversations_session ON agent.conversations(session_id);
 CREATE INDEX idx_conversations_created_at ON agent.conversations(created_at DESC);
 
+-- System-agent service indexes (mirrored from app/models/database.py;
+-- create_all(checkfirst=True) skips existing tables, so they must be
+-- provisioned here for live databases)
+CREATE INDEX ix_tasks_filter ON agent.tasks(status, task_type, assigned_agent);
+CREATE INDEX ix_tasks_pending ON agent.tasks(priority DESC, created_at ASC) WHERE status = 'pending';
+CREATE INDEX ix_tasks_failed_retry ON agent.tasks(priority DESC, updated_at ASC) WHERE status = 'failed';
+CREATE INDEX ix_kb_category_active ON agent.knowledge_base(category, is_active);
+CREATE INDEX ix_conv_session_created ON agent.conversations(session_id, created_at, id);
+
 -- Notification indexes
 CREATE INDEX idx_notifications_status ON notification.notifications(status);
 CREATE INDEX idx_notifications_scheduled ON notification.notifications(scheduled_at) WHERE status = 'pending';
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import structlog
 import uuid
 from datetime import datetime
 
-from app.db.database import get_db
-from app.services.task_service import TaskService
-from app.services.chat_service import ChatService
-from app.services.knowledge_service import KnowledgeService
+from app.db.database import AsyncSessionLocal, get_db, get_pool_status
+from app.db.redis import cached
+from app.services.task_service import TaskService, get_task_service
+from app.services.chat_service import ChatService, get_chat_service
+from app.services.knowledge_service import KnowledgeService, get_knowledge_service
 from app.models.schemas import (
     TaskCreate,
     TaskUpdate,
@@ -23,57 +26,77 @@ from app.models.schemas import (
     KnowledgeBaseResponse,
     KnowledgeSearchRequest,
     KnowledgeSearchResponse,
-    HealthResponse
+    HealthResponse,
+    TaskResponseList,
+    KnowledgeBaseResponseList,
+    ConversationResponseList
 )
 from app.workers.task_worker import route_task
 
 logger = structlog.get_logger()
 router = APIRouter()
 
-# Initialize services
-task_service = TaskService()
-chat_service = ChatService()
-knowledge_service = KnowledgeService()
+
+def fast_uuid(value: str) -> uuid.UUID:
+    """Parse a UUID path param without the generic Pydantic validator
+
+    The canonical 36-char form takes the fast path (bytes.fromhex on
+    the stripped string is several times faster); anything else falls
+    back to uuid.UUID, which accepts the same alternate forms the
+    baseline did (dashless hex, urn:, braces).
+    """
+    if len(value) == 36:
+        try:
+            return uuid.UUID(bytes=bytes.fromhex(value.replace("-", "")))
+        except ValueError:
+            pass
+    try:
+        return uuid.UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid UUID in path"
+        )
 
 
 # Health check endpoint
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
-    return HealthResponse(
-        status="healthy",
-        version="1.0.0",
-        timestamp=datetime.utcnow(),
-        services={
-            "database": "connected",
-            "redis": "connected",
-            "chromadb": "connected",
-            "openai": "configured"
+    """Health check endpoint (cached for 1s to absorb aggressive polling)"""
+    async def _build_health():
+        return {
+            "status": "healthy",
+            "version": "1.0.0",
+            "timestamp": datetime.utcnow().isoformat(),
+            "services": {
+                "database": "connected",
+                "database_pool": get_pool_status(),
+                "redis": "connected",
+                "chromadb": "connected",
+                "openai": "configured"
+            }
         }
-    )
+
+    return await cached("health:system-agent", 1, _build_health)
 
 
 # Task Management Endpoints
 @router.post("/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
 ):
     """Create a new task"""
     try:
         # Create task in database
         task = await task_service.create_task(db, task_data)
-        
-        # Route task to appropriate worker if it should be processed immediately
+
+        # Enqueue to Celery if it should be processed immediately; execution
+        # happens on worker processes, not the API event loop
         if not task_data.scheduled_at or task_data.scheduled_at <= datetime.utcnow():
-            background_tasks.add_task(
-                route_task,
-                task_data.task_type,
-                str(task.id),
-                task_data.payload
-            )
-        
+            route_task(task_data.task_type, str(task.id), task_data.payload)
+
         return task
     except Exception as e:
         logger.error("Failed to create task", error=str(e))
@@ -83,12 +106,77 @@ async def create_task(
         )
 
 
+# Fixed-path /tasks routes must be registered before /tasks/{task_id},
+# or the path-param route matches first and they become unreachable
+@router.get("/tasks/stream")
+async def stream_tasks(
+    status: Optional[TaskStatus] = None,
+    task_type: Optional[TaskType] = None,
+    assigned_agent: Optional[str] = None,
+    task_service: TaskService = Depends(get_task_service)
+):
+    """Stream all matching tasks as a JSON array chunk-by-chunk
+
+    Unlike /tasks this has no limit; rows are fetched and serialized
+    one at a time so large exports don't spike memory. The session is
+    opened inside the generator: a get_db dependency would be torn down
+    before the response body is iterated, closing the server-side
+    cursor mid-stream.
+    """
+    async def generate():
+        async with AsyncSessionLocal() as session:
+            rows = await task_service.stream_tasks(
+                session, status, task_type, assigned_agent
+            )
+            yield b"["
+            first = True
+            async for task in rows:
+                if not first:
+                    yield b","
+                first = False
+                yield orjson.dumps(TaskResponse.model_validate(task).model_dump(mode="json"))
+            yield b"]"
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+
+@router.get("/tasks/pending/queue")
+async def get_pending_tasks(
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
+):
+    """Get pending tasks in queue"""
+    tasks = await task_service.get_pending_tasks(db, limit)
+    return ORJSONResponse(TaskResponseList.dump_python(tasks, mode="json"))
+
+
+@router.post("/tasks/pending/claim")
+async def claim_pending_tasks(
+    limit: int = 10,
+    agent_id: str = "system-agent",
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
+):
+    """Atomically claim pending tasks for a worker (SKIP LOCKED)"""
+    tasks = await task_service.claim_pending_tasks(db, limit, agent_id)
+    return ORJSONResponse(TaskResponseList.dump_python(tasks, mode="json"))
+
+
+@router.get("/tasks/statistics")
+async def get_task_statistics(db: AsyncSession = Depends(get_db), task_service: TaskService = Depends(get_task_service)):
+    """Get task statistics (cached for 5s to keep aggregates off the DB hot path)"""
+    return await cached("stats:tasks", 5, lambda: task_service.get_task_statistics(db))
+
+
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
 async def get_task(
-    task_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db)
+    task_id: str,
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
 ):
     """Get a task by ID"""
+    task_id = fast_uuid(task_id)
     task = await task_service.get_task(db, task_id)
     if not task:
         raise HTTPException(
@@ -100,11 +188,13 @@ async def get_task(
 
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(
-    task_id: uuid.UUID,
+    task_id: str,
     update_data: TaskUpdate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
 ):
     """Update a task"""
+    task_id = fast_uuid(task_id)
     task = await task_service.update_task(db, task_id, update_data)
     if not task:
         raise HTTPException(
@@ -116,10 +206,12 @@ async def update_task(
 
 @router.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
-    task_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db)
+    task_id: str,
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
 ):
     """Delete a task"""
+    task_id = fast_uuid(task_id)
     success = await task_service.delete_task(db, task_id)
     if not success:
         raise HTTPException(
@@ -128,41 +220,30 @@ async def delete_task(
         )
 
 
-@router.get("/tasks", response_model=List[TaskResponse])
+@router.get("/tasks")
 async def get_tasks(
     status: Optional[TaskStatus] = None,
     task_type: Optional[TaskType] = None,
     assigned_agent: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
 ):
     """Get tasks with optional filtering"""
-    return await task_service.get_tasks(
+    tasks = await task_service.get_tasks(
         db, status, task_type, assigned_agent, limit, offset
     )
-
-
-@router.get("/tasks/pending/queue", response_model=List[TaskResponse])
-async def get_pending_tasks(
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get pending tasks in queue"""
-    return await task_service.get_pending_tasks(db, limit)
-
-
-@router.get("/tasks/statistics")
-async def get_task_statistics(db: AsyncSession = Depends(get_db)):
-    """Get task statistics"""
-    return await task_service.get_task_statistics(db)
+    # Rows are plain dicts; orjson handles UUID/datetime natively
+    return ORJSONResponse(tasks)
 
 
 # Chat Endpoints
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     chat_message: ChatMessage,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    chat_service: ChatService = Depends(get_chat_service)
 ):
     """Process a chat message with AI response"""
     try:
@@ -175,15 +256,43 @@ async def chat(
         )
 
 
-@router.get("/chat/{session_id}/history", response_model=List[ConversationResponse])
+@router.post("/chat/stream")
+async def chat_stream(
+    chat_message: ChatMessage,
+    db: AsyncSession = Depends(get_db),
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """Stream an AI chat response as server-sent events
+
+    Emits one `token` frame per generated chunk and a terminal `done`
+    frame with sources and the conversation id. /chat stays available
+    for callers that want the full response in one body.
+    """
+    return StreamingResponse(
+        chat_service.stream_chat_message(db, chat_message),
+        media_type="text/event-stream"
+    )
+
+
+@router.get("/chat/{session_id}/history")
 async def get_chat_history(
     session_id: str,
     limit: int = 50,
-    db: AsyncSession = Depends(get_db)
+    cursor_created_at: Optional[datetime] = None,
+    cursor_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_db),
+    chat_service: ChatService = Depends(get_chat_service)
 ):
-    """Get chat history for a session"""
+    """Get chat history for a session
+
+    Older pages are fetched by passing the (created_at, id) of the
+    oldest message already seen as the cursor.
+    """
     try:
-        return await chat_service.get_conversation_history(db, session_id, limit)
+        history = await chat_service.get_conversation_history(
+            db, session_id, limit, cursor_created_at, cursor_id
+        )
+        return ORJSONResponse(ConversationResponseList.dump_python(history, mode="json"))
     except Exception as e:
         logger.error("Failed to get chat history", error=str(e))
         raise HTTPException(
@@ -193,7 +302,7 @@ async def get_chat_history(
 
 
 @router.delete("/chat/{session_id}/memory", status_code=status.HTTP_204_NO_CONTENT)
-async def clear_chat_memory(session_id: str):
+async def clear_chat_memory(session_id: str, chat_service: ChatService = Depends(get_chat_service)):
     """Clear chat memory for a session"""
     success = await chat_service.clear_conversation_memory(session_id)
     if not success:
@@ -204,7 +313,7 @@ async def clear_chat_memory(session_id: str):
 
 
 @router.get("/chat/sessions/active")
-async def get_active_chat_sessions():
+async def get_active_chat_sessions(chat_service: ChatService = Depends(get_chat_service)):
     """Get list of active chat sessions"""
     return {"sessions": await chat_service.get_active_sessions()}
 
@@ -213,7 +322,8 @@ async def get_active_chat_sessions():
 @router.post("/knowledge", response_model=KnowledgeBaseResponse, status_code=status.HTTP_201_CREATED)
 async def create_knowledge_entry(
     knowledge_data: KnowledgeBaseCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    knowledge_service: KnowledgeService = Depends(get_knowledge_service)
 ):
     """Create a new knowledge base entry"""
     try:
@@ -226,12 +336,35 @@ async def create_knowledge_entry(
         )
 
 
+@router.post("/knowledge/bulk", status_code=status.HTTP_201_CREATED)
+async def bulk_create_knowledge_entries(
+    entries: List[KnowledgeBaseCreate],
+    db: AsyncSession = Depends(get_db),
+    knowledge_service: KnowledgeService = Depends(get_knowledge_service)
+):
+    """Create multiple knowledge base entries in a single batch"""
+    try:
+        created = await knowledge_service.bulk_create_knowledge_entries(db, entries)
+        return ORJSONResponse(
+            KnowledgeBaseResponseList.dump_python(created, mode="json"),
+            status_code=status.HTTP_201_CREATED
+        )
+    except Exception as e:
+        logger.error("Failed to bulk create knowledge entries", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to bulk create knowledge entries"
+        )
+
+
 @router.get("/knowledge/{entry_id}", response_model=KnowledgeBaseResponse)
 async def get_knowledge_entry(
-    entry_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db)
+    entry_id: str,
+    db: AsyncSession = Depends(get_db),
+    knowledge_service: KnowledgeService = Depends(get_knowledge_service)
 ):
     """Get a knowledge base entry by ID"""
+    entry_id = fast_uuid(entry_id)
     entry = await knowledge_service.get_knowledge_entry(db, entry_id)
     if not entry:
         raise HTTPException(
@@ -243,11 +376,13 @@ async def get_knowledge_entry(
 
 @router.put("/knowledge/{entry_id}", response_model=KnowledgeBaseResponse)
 async def update_knowledge_entry(
-    entry_id: uuid.UUID,
+    entry_id: str,
     update_data: KnowledgeBaseUpdate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    knowledge_service: KnowledgeService = Depends(get_knowledge_service)
 ):
     """Update a knowledge base entry"""
+    entry_id = fast_uuid(entry_id)
     entry = await knowledge_service.update_knowledge_entry(db, entry_id, update_data)
     if not entry:
         raise HTTPException(
@@ -259,10 +394,12 @@ async def update_knowledge_entry(
 
 @router.delete("/knowledge/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_knowledge_entry(
-    entry_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db)
+    entry_id: str,
+    db: AsyncSession = Depends(get_db),
+    knowledge_service: KnowledgeService = Depends(get_knowledge_service)
 ):
     """Delete a knowledge base entry"""
+    entry_id = fast_uuid(entry_id)
     success = await knowledge_service.delete_knowledge_entry(db, entry_id)
     if not success:
         raise HTTPException(
@@ -271,23 +408,26 @@ async def delete_knowledge_entry(
         )
 
 
-@router.get("/knowledge", response_model=List[KnowledgeBaseResponse])
+@router.get("/knowledge")
 async def get_knowledge_entries(
     category: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    knowledge_service: KnowledgeService = Depends(get_knowledge_service)
 ):
     """Get knowledge base entries with optional filtering"""
-    return await knowledge_service.get_knowledge_entries(
+    entries = await knowledge_service.get_knowledge_entries(
         db, category, limit, offset
     )
+    return ORJSONResponse(KnowledgeBaseResponseList.dump_python(entries, mode="json"))
 
 
 @router.post("/knowledge/search", response_model=KnowledgeSearchResponse)
 async def search_knowledge(
     search_request: KnowledgeSearchRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    knowledge_service: KnowledgeService = Depends(get_knowledge_service)
 ):
     """Search knowledge base using vector similarity"""
     try:
@@ -303,31 +443,27 @@ async def search_knowledge(
 # Task Processing Endpoints (for manual task execution)
 @router.post("/tasks/{task_id}/execute")
 async def execute_task(
-    task_id: uuid.UUID,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    task_id: str,
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
 ):
     """Manually execute a task"""
+    task_id = fast_uuid(task_id)
     task = await task_service.get_task(db, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    
+
     if task.status != TaskStatus.PENDING:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Task is not in pending status"
         )
-    
+
     try:
-        background_tasks.add_task(
-            route_task,
-            task.task_type,
-            str(task.id),
-            task.payload
-        )
+        route_task(task.task_type, str(task.id), task.payload)
         return {"message": "Task execution started"}
     except Exception as e:
         logger.error("Failed to execute task", task_id=str(task_id), error=str(e))
@@ -339,11 +475,12 @@ async def execute_task(
 
 @router.post("/tasks/{task_id}/retry")
 async def retry_task(
-    task_id: uuid.UUID,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    task_id: str,
+    db: AsyncSession = Depends(get_db),
+    task_service: TaskService = Depends(get_task_service)
 ):
     """Retry a failed task"""
+    task_id = fast_uuid(task_id)
     task = await task_service.get_task(db, task_id)
     if not task:
         raise HTTPException(
@@ -370,12 +507,7 @@ async def retry_task(
         )
         
         # Execute task
-        background_tasks.add_task(
-            route_task,
-            task.task_type,
-            str(task.id),
-            task.payload
-        )
+        route_task(task.task_type, str(task.id), task.payload)
         return {"message": "Task retry started"}
     except Exception as e:
         logger.error("Failed to retry task", task_id=str(task_id), error=str(e))
@@ -13,14 +13,21 @@ celery_app = Celery(
 
 # Configure Celery
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    # msgpack + gzip keep Redis memory and broker bandwidth down for
+    # large task payloads (knowledge updates, report parameters)
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    result_serializer="msgpack",
+    task_compression="gzip",
+    result_compression="gzip",
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
     task_time_limit=settings.task_timeout,
     task_soft_time_limit=settings.task_timeout - 30,
     worker_prefetch_multiplier=1,
-    result_expires=3600,  # 1 hour
+    # Task outcomes are persisted on the Task row by the workers; nothing
+    # reads the Celery result backend, so skip storing results entirely
+    task_ignore_result=True,
+    result_expires=3600,  # 1 hour (for tasks that opt back in)
 )
\ No newline at end of file
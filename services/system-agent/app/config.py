@@ -52,6 +52,10 @@ class Settings(BaseSettings):
         default="./chroma_db",
         env="CHROMADB_PERSIST_DIRECTORY"
     )
+    chroma_threads: int = Field(
+        default=4,
+        env="CHROMA_THREADS"
+    )
     
     # Agent settings
     max_tokens: int = Field(
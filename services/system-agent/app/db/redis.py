@@ -0,0 +1,88 @@
+from typing import Any, Awaitable, Callable, Optional
+import json
+
+import redis.asyncio as redis
+import structlog
+
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class RedisClient:
+    """Lazily connected async Redis client shared across the application"""
+
+    def __init__(self):
+        self.client: Optional[redis.Redis] = None
+
+    async def connect(self):
+        """Create Redis connection"""
+        try:
+            self.client = redis.from_url(
+                settings.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+            # Test connection
+            await self.client.ping()
+            logger.info("Redis connection established")
+        except Exception as e:
+            logger.error("Failed to connect to Redis", error=str(e))
+            raise
+
+    async def close(self):
+        """Close Redis connection"""
+        if self.client:
+            await self.client.close()
+            self.client = None
+            logger.info("Redis connection closed")
+
+    def get_client(self) -> redis.Redis:
+        """Get Redis client instance (connects lazily if needed)"""
+        if self.client is None:
+            self.client = redis.from_url(
+                settings.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True,
+                health_check_interval=30
+            )
+        return self.client
+
+
+# Global Redis client instance
+redis_client = RedisClient()
+
+
+def get_redis() -> redis.Redis:
+    """Dependency to get Redis client"""
+    return redis_client.get_client()
+
+
+async def cached(key: str, ttl: int, producer: Callable[[], Awaitable[Any]]) -> Any:
+    """Read-through cache: return the cached JSON value for key, or call
+    producer(), cache its result with the given TTL and return it.
+
+    Falls back to calling producer() directly if Redis is unavailable so
+    caching never breaks the endpoint it wraps.
+    """
+    client = redis_client.get_client()
+    try:
+        hit = await client.get(key)
+        if hit is not None:
+            return json.loads(hit)
+    except Exception as e:
+        logger.warning("Redis cache read failed", key=key, error=str(e))
+        return await producer()
+
+    value = await producer()
+    try:
+        await client.set(key, json.dumps(value, default=str), ex=ttl)
+    except Exception as e:
+        logger.warning("Redis cache write failed", key=key, error=str(e))
+    return value
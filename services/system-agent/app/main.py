@@ -1,11 +1,14 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import structlog
 
 from app.config import get_settings
 from app.api.endpoints import router
 from app.utils.logging import configure_logging
-from app.db.database import init_db, close_db
+from app.db.database import init_db, close_db, db_ping_loop
+from app.db.redis import redis_client
 
 # Configure logging
 configure_logging()
@@ -24,20 +27,37 @@ async def lifespan(app: FastAPI):
     try:
         # Initialize database
         await init_db()
-        
-        # Import and initialize services (this will create connections)
-        from app.services.task_service import TaskService
-        from app.services.chat_service import ChatService
-        from app.services.knowledge_service import KnowledgeService
-        
-        # Initialize services
-        task_service = TaskService()
-        chat_service = ChatService()
-        knowledge_service = KnowledgeService()
-        
+
+        # Connect shared Redis client (response caching)
+        await redis_client.connect()
+
+        # Background connection validation (replaces pool_pre_ping)
+        db_ping_task = asyncio.create_task(db_ping_loop())
+
+        # Initialize the shared service singletons (same instances the
+        # endpoints get via Depends) so connections are created here, not
+        # on the first request
+        from app.services.task_service import get_task_service
+        from app.services.chat_service import get_chat_service
+        from app.services.knowledge_service import get_knowledge_service
+
+        get_task_service()
+        chat_service = get_chat_service()
+        knowledge_service = get_knowledge_service()
+
         # Test ChromaDB connection
         _ = knowledge_service.collection
-        
+
+        # Warm the lazy singletons so the first request after a worker
+        # boots doesn't pay client bootstrap / collection open / prompt
+        # assembly costs
+        _ = chat_service.chat_model
+        _ = chat_service.response_cache.collection
+        chat_service.build_static_system_prompt()
+
+        # Start the batched vector-store write flusher
+        await knowledge_service.startup()
+
         logger.info("Services initialized successfully")
         
     except Exception as e:
@@ -49,6 +69,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down System Agent Service")
     try:
+        db_ping_task.cancel()
+        from app.services.knowledge_service import get_knowledge_service
+        await get_knowledge_service().shutdown()
+        await redis_client.close()
         await close_db()
     except Exception as e:
         logger.error("Error during shutdown", error=str(e))
@@ -61,6 +85,7 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     description="System Agent service with AI-powered chat, knowledge management, and task processing"
 )
 
@@ -86,11 +111,26 @@ async def root():
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8083,
-        reload=settings.debug,
-        log_config=None  # We use structlog instead
-    )
\ No newline at end of file
+    if settings.debug:
+        # Single worker with auto-reload for local development
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8083,
+            reload=True,
+            log_config=None  # We use structlog instead
+        )
+    else:
+        # uvloop + httptools cut event-loop and HTTP-parse overhead;
+        # multiple workers use the available cores past the GIL
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8083,
+            workers=int(os.getenv("WORKERS", "4")),
+            loop="uvloop",
+            http="httptools",
+            log_config=None  # We use structlog instead
+        )
\ No newline at end of file
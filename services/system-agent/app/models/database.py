@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, JSON, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -10,8 +10,7 @@ from app.db.database import Base
 class Task(Base):
     """Agent Tasks table model"""
     __tablename__ = "tasks"
-    __table_args__ = {"schema": "agent"}
-    
+
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     task_type = Column(String(100), nullable=False)
     priority = Column(Integer, default=5)
@@ -28,18 +27,38 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Declared after the columns so the partial indexes can state the
+    # per-column direction: the polls order by priority DESC, timestamp
+    # ASC, and a same-direction btree cannot serve that mixed ORDER BY
+    __table_args__ = (
+        # Covers the filter combinations used by TaskService.get_tasks
+        Index("ix_tasks_filter", "status", "task_type", "assigned_agent"),
+        # Partial index matching the pending-queue poll ordering
+        Index("ix_tasks_pending", priority.desc(), created_at.asc(),
+              postgresql_where=text("status = 'pending'")),
+        # Partial index matching the failed-retry poll ordering
+        Index("ix_tasks_failed_retry", priority.desc(), updated_at.asc(),
+              postgresql_where=text("status = 'failed'")),
+        {"schema": "agent"},
+    )
+
 
 class KnowledgeBase(Base):
     """Agent Knowledge Base table model"""
     __tablename__ = "knowledge_base"
-    __table_args__ = {"schema": "agent"}
+    __table_args__ = (
+        Index("ix_kb_category_active", "category", "is_active"),
+        {"schema": "agent"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     category = Column(String(100), nullable=False)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     embedding_id = Column(String(255))
-    metadata = Column(JSON, default={})
+    # Attribute is "meta" because "metadata" is reserved by DeclarativeBase;
+    # the underlying column keeps its original name
+    meta = Column("metadata", JSON, default=dict)
     tags = Column(JSON, default=[])
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -50,7 +69,10 @@ class KnowledgeBase(Base):
 class Conversation(Base):
     """Agent Conversations table model"""
     __tablename__ = "conversations"
-    __table_args__ = {"schema": "agent"}
+    __table_args__ = (
+        Index("ix_conv_session_created", "session_id", "created_at", "id"),
+        {"schema": "agent"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(String(255), nullable=False)
@@ -1,10 +1,27 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
 from uuid import UUID
 from enum import Enum
 
 
+@lru_cache(maxsize=None)
+def _trusted_fields(cls):
+    """(field names, ORM attribute getter) for a model, resolved once
+
+    The field set of a model class never changes, so the introspection
+    and the attrgetter construction are folded out of the per-row path.
+    Attributes are read through the field alias when one is set.
+    """
+    names = tuple(cls.model_fields)
+    getter = attrgetter(*(
+        field.alias or name for name, field in cls.model_fields.items()
+    ))
+    return names, getter
+
+
 # Enums
 class TaskStatus(str, Enum):
     PENDING = "pending"
@@ -28,6 +45,23 @@ class TaskType(str, Enum):
     REPORT = "report"
 
 
+class TrustedORMMixin:
+    """Adds a validation-free constructor for rows from our own tables"""
+
+    @classmethod
+    def from_orm_trusted(cls, obj):
+        """Build the model from a trusted ORM row without validation
+
+        Rows loaded from our own tables already carry the right types,
+        so model_construct skips the per-field validators that dominate
+        list-endpoint CPU. Field introspection is memoized per class and
+        attributes are fetched with a single precompiled attrgetter
+        (metadata is stored on the ORM object as meta, via its alias).
+        """
+        names, getter = _trusted_fields(cls)
+        return cls.model_construct(**dict(zip(names, getter(obj))))
+
+
 # Task schemas
 class TaskBase(BaseModel):
     task_type: TaskType
@@ -47,7 +81,7 @@ class TaskUpdate(BaseModel):
     error_message: Optional[str] = None
 
 
-class TaskResponse(TaskBase):
+class TaskResponse(TaskBase, TrustedORMMixin):
     model_config = ConfigDict(from_attributes=True)
     
     id: UUID
@@ -65,10 +99,14 @@ class TaskResponse(TaskBase):
 
 # Knowledge Base schemas
 class KnowledgeBaseBase(BaseModel):
+    # The ORM attribute is "meta" ("metadata" is reserved by SQLAlchemy's
+    # DeclarativeBase); the API keeps exposing "metadata"
+    model_config = ConfigDict(populate_by_name=True)
+
     category: str
     title: str
     content: str
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = Field(default_factory=dict, alias="meta")
     tags: List[str] = Field(default_factory=list)
 
 
@@ -77,16 +115,18 @@ class KnowledgeBaseCreate(KnowledgeBaseBase):
 
 
 class KnowledgeBaseUpdate(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     category: Optional[str] = None
     title: Optional[str] = None
     content: Optional[str] = None
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = Field(default=None, alias="meta")
     tags: Optional[List[str]] = None
     is_active: Optional[bool] = None
 
 
-class KnowledgeBaseResponse(KnowledgeBaseBase):
-    model_config = ConfigDict(from_attributes=True)
+class KnowledgeBaseResponse(KnowledgeBaseBase, TrustedORMMixin):
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
     
     id: UUID
     embedding_id: Optional[str] = None
@@ -109,7 +149,7 @@ class ConversationCreate(ConversationBase):
     parent_message_id: Optional[UUID] = None
 
 
-class ConversationResponse(ConversationBase):
+class ConversationResponse(ConversationBase, TrustedORMMixin):
     model_config = ConfigDict(from_attributes=True)
     
     id: UUID
@@ -162,4 +202,12 @@ class HealthResponse(BaseModel):
     status: str
     version: str
     timestamp: datetime
-    services: Dict[str, str] = Field(default_factory=dict)
\ No newline at end of file
+    services: Dict[str, str] = Field(default_factory=dict)
+
+
+# Precompiled list adapters, built once at import time so list endpoints
+# can serialize without going through FastAPI's per-request response_model
+# validation machinery
+TaskResponseList = TypeAdapter(List[TaskResponse])
+KnowledgeBaseResponseList = TypeAdapter(List[KnowledgeBaseResponse])
+ConversationResponseList = TypeAdapter(List[ConversationResponse])
\ No newline at end of file
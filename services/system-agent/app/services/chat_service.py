@@ -1,38 +1,200 @@
 from typing import List, Dict, Any, Optional
+import asyncio
 from langchain.llms import OpenAI
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
 from langchain.chains import ConversationChain
-from langchain.memory import ConversationBufferWindowMemory
+from langchain.memory import ConversationBufferWindowMemory, RedisChatMessageHistory
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, insert, tuple_
+from sqlalchemy.orm import aliased
 import structlog
+import hashlib
+import json
 import uuid
+from datetime import datetime
+from functools import lru_cache
 
 from app.config import get_settings
+from app.db.database import AsyncSessionLocal
+from app.db.redis import redis_client
 from app.models.database import Conversation
 from app.models.schemas import (
     ChatMessage,
     ChatResponse,
     ConversationCreate,
     ConversationResponse,
-    MessageType,
-    KnowledgeSearchRequest
+    MessageType
 )
-from app.services.knowledge_service import KnowledgeService
+from app.services.knowledge_service import KnowledgeService, get_knowledge_service
 
 logger = structlog.get_logger()
 settings = get_settings()
 
+# Redis recent-history cache: last N messages per session, expiring after
+# an hour of idle time
+_HISTORY_CACHE_SIZE = 100
+_HISTORY_CACHE_TTL = 3600
+
+# Minimum cosine similarity for a semantic response-cache hit
+_RESPONSE_CACHE_THRESHOLD = 0.92
+
+# Recent RAG results: repeat questions hit this instead of the vector
+# store; entries expire after a minute and are keyed on the knowledge
+# base's mutation generation so writes invalidate them immediately
+_RAG_CACHE_SIZE = 4096
+_RAG_CACHE_TTL = 60
+
+# Bounds on in-process conversation memories: idle sessions expire after
+# an hour, and the least recently used are evicted past 10k sessions
+_MEMORY_CACHE_SIZE = 10_000
+_MEMORY_CACHE_TTL = 3600
+
+# Redis-backed message history: shared across workers, dropped after a
+# day of session inactivity
+_REDIS_MEMORY_PREFIX = "chat:mem:"
+_REDIS_MEMORY_TTL = 86400
+
+
+def _sse_frame(payload: Dict[str, Any]) -> bytes:
+    """Encode one server-sent-event data frame"""
+    return b"data: " + json.dumps(payload).encode() + b"\n\n"
+
+
+class _EvictingTTLCache(TTLCache):
+    """TTLCache that logs LRU evictions of conversation memories"""
+
+    def popitem(self):
+        session_id, memory = super().popitem()
+        logger.info("Evicted conversation memory", session_id=session_id)
+        return session_id, memory
+
+
+class ResponseCache:
+    """Semantic cache of generated chat responses
+
+    Stores each answered prompt in a dedicated ChromaDB collection keyed
+    on its embedding; a later prompt in the same session that lands above
+    the similarity threshold short-circuits RAG and the LLM call, turning
+    the whole generation into a single vector lookup.
+    """
+
+    def __init__(self, knowledge_service: KnowledgeService):
+        self._knowledge_service = knowledge_service
+        self._collection = None
+
+    @property
+    def collection(self):
+        """Get or create the response cache collection"""
+        if self._collection is None:
+            client = self._knowledge_service.chroma_client
+            try:
+                self._collection = client.get_collection(
+                    name="chat_response_cache"
+                )
+            except Exception:
+                self._collection = client.create_collection(
+                    name="chat_response_cache",
+                    metadata={"description": "Semantic cache of chat responses"}
+                )
+                logger.info("Created new ChromaDB collection: chat_response_cache")
+        return self._collection
+
+    async def lookup(
+        self,
+        message: str,
+        session_id: str,
+        threshold: float = _RESPONSE_CACHE_THRESHOLD,
+        query_embedding: Optional[List[float]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a semantically equivalent prompt
+
+        Only prompts from the same session are considered. Returns None on
+        a miss or any cache error — the cache must never fail the chat.
+        """
+        try:
+            query_args = (
+                {"query_embeddings": [query_embedding]}
+                if query_embedding is not None
+                else {"query_texts": [message]}
+            )
+            # Blocking Chroma call: keep it off the event-loop thread
+            results = await asyncio.to_thread(
+                self.collection.query,
+                n_results=1,
+                where={"session_id": session_id},
+                **query_args
+            )
+            if not results["ids"] or not results["ids"][0]:
+                return None
+
+            similarity = 1 - results["distances"][0][0]
+            if similarity < threshold:
+                return None
+
+            metadata = results["metadatas"][0][0]
+            return {
+                "response": metadata["response"],
+                "sources": json.loads(metadata.get("sources", "[]")),
+                "similarity": similarity
+            }
+
+        except Exception as e:
+            logger.warning("Response cache lookup failed",
+                          session_id=session_id, error=str(e))
+            return None
+
+    async def put(
+        self,
+        message: str,
+        session_id: str,
+        response: str,
+        sources: List[Dict[str, Any]],
+        query_embedding: Optional[List[float]] = None
+    ) -> None:
+        """Store a generated response keyed on the prompt embedding"""
+        try:
+            await asyncio.to_thread(
+                self.collection.add,
+                embeddings=[query_embedding] if query_embedding is not None else None,
+                documents=[message],
+                metadatas=[{
+                    "session_id": session_id,
+                    "response": response,
+                    "sources": json.dumps(sources)
+                }],
+                ids=[str(uuid.uuid4())]
+            )
+        except Exception as e:
+            logger.warning("Response cache write failed",
+                          session_id=session_id, error=str(e))
+
 
 class ChatService:
     """Service for AI-powered chat functionality with RAG"""
     
     def __init__(self):
         self.settings = settings
-        self.knowledge_service = KnowledgeService()
+        # Share the singleton the API endpoints use: RAG cache keys read
+        # its mutation_generation, so knowledge writes through /knowledge
+        # must bump the same counter (and we avoid duplicating the Chroma
+        # client, thread pool and query batcher per process)
+        self.knowledge_service = get_knowledge_service()
+        self.response_cache = ResponseCache(self.knowledge_service)
+        self._rag_cache = TTLCache(maxsize=_RAG_CACHE_SIZE, ttl=_RAG_CACHE_TTL)
+        # Single-flight map: concurrent identical RAG queries share one
+        # vector search instead of each hitting ChromaDB
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Strong references to fire-and-forget tasks so the event loop
+        # cannot garbage-collect them mid-flight
+        self._background_tasks: set = set()
         self._chat_model = None
-        self._conversation_memories = {}  # Session-based memory storage
+        # Session-based memory storage, bounded by count and idle TTL so
+        # long-running workers don't pin every session ever seen
+        self._conversation_memories = _EvictingTTLCache(
+            maxsize=_MEMORY_CACHE_SIZE, ttl=_MEMORY_CACHE_TTL
+        )
         
     @property
     def chat_model(self):
@@ -53,10 +215,21 @@ class ChatService:
         return self._chat_model
     
     def get_conversation_memory(self, session_id: str) -> ConversationBufferWindowMemory:
-        """Get or create conversation memory for a session"""
+        """Get or create conversation memory for a session
+
+        The message history lives in Redis so every worker sees the same
+        conversation and no sticky sessions are needed; the in-process
+        TTL cache is only an L1 holding the wrapper for hot sessions.
+        """
         if session_id not in self._conversation_memories:
             self._conversation_memories[session_id] = ConversationBufferWindowMemory(
                 k=10,  # Keep last 10 exchanges
+                chat_memory=RedisChatMessageHistory(
+                    session_id=session_id,
+                    url=self.settings.redis_url,
+                    key_prefix=_REDIS_MEMORY_PREFIX,
+                    ttl=_REDIS_MEMORY_TTL
+                ),
                 return_messages=True
             )
             logger.info("Created new conversation memory", session_id=session_id)
@@ -70,9 +243,15 @@ class ChatService:
         message_type: MessageType,
         user_id: Optional[str] = None,
         context: Dict[str, Any] = None,
-        parent_message_id: Optional[uuid.UUID] = None
+        parent_message_id: Optional[uuid.UUID] = None,
+        message_id: Optional[uuid.UUID] = None
     ) -> ConversationResponse:
-        """Save a conversation message to database"""
+        """Save a conversation message to database
+
+        Callers that need the id before the INSERT completes (background
+        persistence of a response already returned) pass a pre-allocated
+        message_id.
+        """
         try:
             conversation_data = ConversationCreate(
                 session_id=session_id,
@@ -82,73 +261,198 @@ class ChatService:
                 context=context or {},
                 parent_message_id=parent_message_id
             )
-            
-            db_conversation = Conversation(**conversation_data.model_dump())
-            db.add(db_conversation)
+
+            values = conversation_data.model_dump()
+            if message_id is not None:
+                values["id"] = message_id
+
+            # Single round-trip: RETURNING brings back the server-generated
+            # id and created_at, so no follow-up SELECT via refresh
+            stmt = (
+                insert(Conversation)
+                .values(**values)
+                .returning(Conversation)
+            )
+            db_conversation = (await db.execute(stmt)).scalar_one()
             await db.commit()
-            await db.refresh(db_conversation)
-            
-            return ConversationResponse.model_validate(db_conversation)
-            
+
+            response = ConversationResponse.model_validate(db_conversation)
+            await self._cache_conversation_message(response)
+            return response
+
         except Exception as e:
             await db.rollback()
-            logger.error("Failed to save conversation message", 
+            logger.error("Failed to save conversation message",
                         session_id=session_id, error=str(e))
             raise
+
+    async def _save_message_own_session(self, *args, **kwargs) -> ConversationResponse:
+        """Save a conversation message on a dedicated session
+
+        Used when the save runs concurrently with work on the request's
+        session: AsyncSession is not safe for concurrent use, so parallel
+        persistence gets its own short-lived session from the factory.
+        """
+        async with AsyncSessionLocal() as session:
+            return await self.save_conversation_message(session, *args, **kwargs)
+
+    async def _cache_conversation_message(self, conversation: ConversationResponse) -> None:
+        """Append a saved message to the Redis recent-history cache"""
+        try:
+            client = redis_client.get_client()
+            key = f"chat:history:{conversation.session_id}"
+            await client.rpush(key, conversation.model_dump_json())
+            await client.ltrim(key, -_HISTORY_CACHE_SIZE, -1)
+            await client.expire(key, _HISTORY_CACHE_TTL)
+        except Exception as e:
+            # Cache failures must never fail the chat itself
+            logger.warning("Failed to cache conversation message",
+                          session_id=conversation.session_id, error=str(e))
     
     async def get_conversation_history(
         self, 
         db: AsyncSession, 
         session_id: str,
-        limit: int = 50
+        limit: int = 50,
+        cursor_created_at: Optional[datetime] = None,
+        cursor_id: Optional[uuid.UUID] = None
     ) -> List[ConversationResponse]:
-        """Get conversation history for a session"""
+        """Get conversation history for a session
+
+        Serves full pages from the Redis recent-history cache when it
+        holds enough messages, skipping the DB round-trip for the common
+        polling case; otherwise falls back to Postgres.
+
+        Pagination is keyset-based: pass the (created_at, id) of the
+        oldest message already seen to fetch the page before it. Each
+        page is O(limit) index lookups on (session_id, created_at, id)
+        no matter how long the conversation is, and the chronological
+        re-order happens in SQL rather than with a Python reverse().
+        """
         try:
-            result = await db.execute(
+            if cursor_created_at is None and cursor_id is None:
+                cached_messages = await self._get_cached_history(session_id, limit)
+                if cached_messages is not None:
+                    return cached_messages
+
+            page = (
                 select(Conversation)
                 .where(Conversation.session_id == session_id)
-                .order_by(Conversation.created_at.desc())
+                .order_by(Conversation.created_at.desc(), Conversation.id.desc())
                 .limit(limit)
             )
-            conversations = result.scalars().all()
-            conversations.reverse()  # Return in chronological order
-            
-            return [ConversationResponse.model_validate(conv) for conv in conversations]
+            if cursor_created_at is not None and cursor_id is not None:
+                page = page.where(
+                    tuple_(Conversation.created_at, Conversation.id)
+                    < (cursor_created_at, cursor_id)
+                )
+
+            # Re-order the fetched page chronologically server-side
+            sub = page.subquery()
+            conv = aliased(Conversation, sub)
+            result = await db.execute(
+                select(conv)
+                .order_by(sub.c.created_at.asc(), sub.c.id.asc())
+            )
+            # Trusted rows from our own table: skip per-row validation
+            return [
+                ConversationResponse.from_orm_trusted(c)
+                for c in result.scalars()
+            ]
             
         except Exception as e:
-            logger.error("Failed to get conversation history", 
+            logger.error("Failed to get conversation history",
                         session_id=session_id, error=str(e))
             raise
+
+    async def _get_cached_history(
+        self,
+        session_id: str,
+        limit: int
+    ) -> Optional[List[ConversationResponse]]:
+        """Return a full page from the Redis history cache, or None
+
+        Only serves the cache when it holds at least `limit` messages, so
+        partial caches (fresh sessions, post-expiry) never truncate the
+        history a client sees.
+        """
+        try:
+            client = redis_client.get_client()
+            raw_messages = await client.lrange(f"chat:history:{session_id}", -limit, -1)
+            if raw_messages and len(raw_messages) >= limit:
+                return [ConversationResponse.model_validate_json(raw) for raw in raw_messages]
+            return None
+        except Exception as e:
+            logger.warning("Failed to read conversation history cache",
+                          session_id=session_id, error=str(e))
+            return None
     
     async def retrieve_relevant_knowledge(
-        self, 
-        db: AsyncSession, 
+        self,
+        db: AsyncSession,
         query: str,
-        limit: int = 3
+        limit: int = 3,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
-        """Retrieve relevant knowledge for RAG"""
+        """Retrieve relevant knowledge for RAG
+
+        Popular questions repeat: results are served from a short-lived
+        in-process cache keyed on the normalized query, invalidated by
+        any knowledge-base write via the mutation generation.
+        """
         try:
-            search_request = KnowledgeSearchRequest(
-                query=query,
-                limit=limit,
-                similarity_threshold=0.6
+            cache_key = (
+                query.strip().casefold(),
+                limit,
+                self.knowledge_service.mutation_generation
             )
-            
-            search_results = await self.knowledge_service.search_knowledge(
-                db, search_request
-            )
-            
-            # Format results for context
-            knowledge_sources = []
-            for result in search_results.results:
-                knowledge_sources.append({
-                    "title": result.title,
-                    "content": result.content,
-                    "category": result.category,
-                    "similarity_score": result.similarity_score,
-                    "id": str(result.id)
-                })
-            
+            cached_sources = self._rag_cache.get(cache_key)
+            if cached_sources is not None:
+                return cached_sources
+
+            # Single-flight: if an identical search is already running,
+            # await its result instead of issuing another vector query.
+            # The key carries every parameter that shapes the result set,
+            # so a limit=10 caller is never handed a limit=3 payload
+            flight_key = hashlib.blake2b(
+                f"{query.strip().casefold()}\x00{limit}".encode(),
+                digest_size=16
+            ).hexdigest()
+            inflight = self._inflight.get(flight_key)
+            if inflight is not None:
+                return await inflight
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[flight_key] = future
+            try:
+                # Plain-argument entry point: no request model built
+                # per chat turn
+                search_results = await self.knowledge_service._search_internal(
+                    db, query, limit, 0.6, query_embedding=query_embedding
+                )
+
+                # Format results for context
+                knowledge_sources = []
+                for result in search_results.results:
+                    knowledge_sources.append({
+                        "title": result.title,
+                        "content": result.content,
+                        "category": result.category,
+                        "similarity_score": result.similarity_score,
+                        "id": str(result.id)
+                    })
+
+                self._rag_cache[cache_key] = knowledge_sources
+                future.set_result(knowledge_sources)
+            except Exception:
+                # Waiters get the same empty-result contract the failing
+                # caller falls back to below
+                if not future.done():
+                    future.set_result([])
+                raise
+            finally:
+                del self._inflight[flight_key]
+
             logger.info("Retrieved knowledge for RAG", 
                        query=query, sources_count=len(knowledge_sources))
             
@@ -159,9 +463,17 @@ class ChatService:
                         query=query, error=str(e))
             return []  # Return empty list on error, don't fail the chat
     
-    def build_system_prompt(self, knowledge_sources: List[Dict[str, Any]]) -> str:
-        """Build system prompt with relevant knowledge"""
-        base_prompt = """You are a helpful AI assistant for the Chorus platform. You have access to relevant knowledge from the system's knowledge base to help answer questions accurately.
+    @staticmethod
+    @lru_cache()
+    def build_static_system_prompt() -> str:
+        """Return the constant system prompt
+
+        Deliberately contains nothing per-query: providers that support
+        prompt-prefix caching only get hits while the leading tokens are
+        byte-identical across requests, so per-query knowledge must go in
+        a later message (see build_knowledge_message).
+        """
+        return """You are a helpful AI assistant for the Chorus platform. You have access to relevant knowledge from the system's knowledge base to help answer questions accurately.
 
 Instructions:
 1. Use the provided knowledge sources to inform your responses
@@ -169,17 +481,116 @@ Instructions:
 3. If you're not sure about something, say so
 4. Cite relevant sources when appropriate
 5. Maintain a professional and friendly tone
-
 """
-        
-        if knowledge_sources:
-            base_prompt += "\nRelevant Knowledge Sources:\n"
-            for i, source in enumerate(knowledge_sources, 1):
-                base_prompt += f"\n{i}. {source['title']} (Category: {source['category']})\n"
-                base_prompt += f"   {source['content']}\n"
-        
-        return base_prompt
+
+    def build_knowledge_message(
+        self, knowledge_sources: List[Dict[str, Any]]
+    ) -> Optional[SystemMessage]:
+        """Build the per-query knowledge message, or None without sources"""
+        if not knowledge_sources:
+            return None
+
+        block = "Relevant Knowledge Sources:\n"
+        for i, source in enumerate(knowledge_sources, 1):
+            block += f"\n{i}. {source['title']} (Category: {source['category']})\n"
+            block += f"   {source['content']}\n"
+
+        return SystemMessage(content=block)
     
+    def _build_messages(
+        self,
+        memory: ConversationBufferWindowMemory,
+        knowledge_sources: List[Dict[str, Any]],
+        user_message: str
+    ) -> List[Any]:
+        """Assemble the model input for one turn
+
+        Message ordering matters for provider prompt-prefix caching:
+        static system prompt first, then history, then the per-query
+        knowledge block, then the new user message. Keep the static
+        prompt at position 0 and inject anything per-query after the
+        history, or the cached prefix is invalidated on every call.
+
+        Reading memory history goes through RedisChatMessageHistory's
+        synchronous client — async callers run this via to_thread.
+        """
+        messages = [SystemMessage(content=self.build_static_system_prompt())]
+
+        # Add conversation history from memory
+        for message in memory.chat_memory.messages:
+            messages.append(message)
+
+        # Add per-query knowledge just before the latest user message
+        knowledge_message = self.build_knowledge_message(knowledge_sources)
+        if knowledge_message is not None:
+            messages.append(knowledge_message)
+
+        # Add current user message
+        messages.append(HumanMessage(content=user_message))
+        return messages
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Schedule background work, holding a reference until done"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _append_turn_to_memory(
+        self,
+        session_id: str,
+        user_message: str,
+        ai_response: str
+    ) -> None:
+        """Append one turn to conversation memory off the event loop
+
+        RedisChatMessageHistory uses a synchronous Redis client, so the
+        writes run in a thread to keep the loop free for concurrent
+        requests.
+        """
+        memory = self.get_conversation_memory(session_id)
+
+        def _append():
+            memory.chat_memory.add_user_message(user_message)
+            memory.chat_memory.add_ai_message(ai_response)
+
+        await asyncio.to_thread(_append)
+
+    async def _finalize_turn(
+        self,
+        session_id: str,
+        user_message: str,
+        user_conv: ConversationResponse,
+        ai_response: str,
+        knowledge_sources_used: int,
+        ai_conv_id: uuid.UUID
+    ) -> None:
+        """Post-response bookkeeping for a completed chat turn
+
+        Runs as a background task after the response has already been
+        returned: updates conversation memory and persists the AI message
+        on a fresh session under its pre-allocated id. Never raises —
+        failures are logged so the worker survives.
+        """
+        try:
+            await self._append_turn_to_memory(
+                session_id, user_message, ai_response
+            )
+
+            await self._save_message_own_session(
+                session_id, ai_response, MessageType.AGENT,
+                context={
+                    "knowledge_sources_used": knowledge_sources_used,
+                    "model": self.settings.openai_model,
+                    "parent_message_id": str(user_conv.id)
+                },
+                parent_message_id=user_conv.id,
+                message_id=ai_conv_id
+            )
+        except Exception as e:
+            logger.error("Failed to finalize chat turn",
+                        session_id=session_id, error=str(e))
+
     async def process_chat_message(
         self, 
         db: AsyncSession, 
@@ -189,53 +600,65 @@ Instructions:
         try:
             session_id = chat_message.session_id
             user_message = chat_message.message
-            
-            # Save user message
-            user_conv = await self.save_conversation_message(
-                db, session_id, user_message, MessageType.USER, 
-                chat_message.user_id, chat_message.context
+            # Tool-calling / state-mutating prompts must not be served from
+            # cache; callers opt out via context
+            bypass_cache = bool(chat_message.context.get("bypass_cache"))
+
+            # Embed the message once; the same vector serves the response
+            # cache and the RAG search instead of three separate forward
+            # passes
+            query_embedding = await asyncio.to_thread(
+                self.knowledge_service.embed, user_message
             )
-            
-            # Retrieve relevant knowledge
-            knowledge_sources = await self.retrieve_relevant_knowledge(
-                db, user_message
+
+            # Semantic cache: a near-identical prompt in this session skips
+            # RAG and the LLM call entirely
+            if not bypass_cache:
+                cached = await self.response_cache.lookup(
+                    user_message, session_id, query_embedding=query_embedding
+                )
+                if cached is not None:
+                    user_conv = await self.save_conversation_message(
+                        db, session_id, user_message, MessageType.USER,
+                        chat_message.user_id, chat_message.context
+                    )
+                    return await self._respond_from_cache(
+                        db, chat_message, user_conv, cached
+                    )
+
+            # Persist the user message and run RAG retrieval concurrently —
+            # they are independent, and the save runs on its own session so
+            # the two coroutines never share one AsyncSession
+            user_conv, knowledge_sources = await asyncio.gather(
+                self._save_message_own_session(
+                    session_id, user_message, MessageType.USER,
+                    chat_message.user_id, chat_message.context
+                ),
+                self.retrieve_relevant_knowledge(
+                    db, user_message, query_embedding=query_embedding
+                )
             )
             
-            # Build system prompt with knowledge
-            system_prompt = self.build_system_prompt(knowledge_sources)
-            
-            # Get conversation memory
+            # Reading memory history hits Redis through a synchronous
+            # client, so assemble the messages in a thread
             memory = self.get_conversation_memory(session_id)
-            
-            # Create messages for the model
-            messages = [SystemMessage(content=system_prompt)]
-            
-            # Add conversation history from memory
-            for message in memory.chat_memory.messages:
-                messages.append(message)
-            
-            # Add current user message
-            messages.append(HumanMessage(content=user_message))
+            messages = await asyncio.to_thread(
+                self._build_messages, memory, knowledge_sources, user_message
+            )
             
             # Generate response
             response = await self.chat_model.agenerate([messages])
             ai_response = response.generations[0][0].text
-            
-            # Update memory
-            memory.chat_memory.add_user_message(user_message)
-            memory.chat_memory.add_ai_message(ai_response)
-            
-            # Save AI response
-            ai_conv = await self.save_conversation_message(
-                db, session_id, ai_response, MessageType.AGENT,
-                context={
-                    "knowledge_sources_used": len(knowledge_sources),
-                    "model": self.settings.openai_model,
-                    "parent_message_id": str(user_conv.id)
-                },
-                parent_message_id=user_conv.id
-            )
-            
+
+            # Memory update and AI-message persistence are not needed on
+            # the user-visible path: pre-allocate the conversation id and
+            # finish the turn in the background
+            ai_conv_id = uuid.uuid4()
+            self._spawn(self._finalize_turn(
+                session_id, user_message, user_conv, ai_response,
+                len(knowledge_sources), ai_conv_id
+            ))
+
             # Format knowledge sources for response
             formatted_sources = []
             for source in knowledge_sources:
@@ -245,8 +668,15 @@ Instructions:
                     "category": source["category"],
                     "similarity_score": source["similarity_score"]
                 })
-            
-            logger.info("Chat message processed", 
+
+            # Feed the cache for subsequent equivalent prompts
+            if not bypass_cache:
+                await self.response_cache.put(
+                    user_message, session_id, ai_response, formatted_sources,
+                    query_embedding=query_embedding
+                )
+
+            logger.info("Chat message processed",
                        session_id=session_id, 
                        message_length=len(user_message),
                        response_length=len(ai_response),
@@ -257,7 +687,7 @@ Instructions:
                 response=ai_response,
                 session_id=session_id,
                 context={
-                    "conversation_id": str(ai_conv.id),
+                    "conversation_id": str(ai_conv_id),
                     "model_used": self.settings.openai_model,
                     **chat_message.context
                 },
@@ -265,15 +695,175 @@ Instructions:
             )
             
         except Exception as e:
-            logger.error("Failed to process chat message", 
+            logger.error("Failed to process chat message",
                         session_id=chat_message.session_id, error=str(e))
             raise
-    
+
+    async def _respond_from_cache(
+        self,
+        db: AsyncSession,
+        chat_message: ChatMessage,
+        user_conv: ConversationResponse,
+        cached: Dict[str, Any]
+    ) -> ChatResponse:
+        """Build a ChatResponse from a semantic cache hit
+
+        The conversation is still persisted and memory still updated so
+        history and follow-up context stay identical to a generated turn;
+        only the RAG + LLM work is skipped.
+        """
+        session_id = chat_message.session_id
+        user_message = chat_message.message
+        ai_response = cached["response"]
+
+        await self._append_turn_to_memory(session_id, user_message, ai_response)
+
+        ai_conv = await self.save_conversation_message(
+            db, session_id, ai_response, MessageType.AGENT,
+            context={
+                "cached": True,
+                "cache_similarity": cached["similarity"],
+                "model": self.settings.openai_model,
+                "parent_message_id": str(user_conv.id)
+            },
+            parent_message_id=user_conv.id
+        )
+
+        logger.info("Chat message served from response cache",
+                   session_id=session_id,
+                   similarity=cached["similarity"])
+
+        return ChatResponse(
+            message=user_message,
+            response=ai_response,
+            session_id=session_id,
+            context={
+                "conversation_id": str(ai_conv.id),
+                "model_used": self.settings.openai_model,
+                "cached": True,
+                **chat_message.context
+            },
+            sources=cached["sources"]
+        )
+
+    async def stream_chat_message(
+        self,
+        db: AsyncSession,
+        chat_message: ChatMessage
+    ):
+        """Stream a RAG-enhanced response token by token
+
+        Yields SSE data frames: one `token` frame per generated chunk,
+        then a terminal `done` frame carrying the sources and the saved
+        conversation id. Persistence, memory updates and the response
+        cache behave exactly as in process_chat_message; only the
+        delivery is incremental, so the caller sees the first token at
+        first-token latency instead of full-generation time.
+        """
+        session_id = chat_message.session_id
+        user_message = chat_message.message
+        bypass_cache = bool(chat_message.context.get("bypass_cache"))
+
+        query_embedding = await asyncio.to_thread(
+            self.knowledge_service.embed, user_message
+        )
+
+        # Cache hits stream as a single token frame
+        if not bypass_cache:
+            cached = await self.response_cache.lookup(
+                user_message, session_id, query_embedding=query_embedding
+            )
+            if cached is not None:
+                user_conv = await self.save_conversation_message(
+                    db, session_id, user_message, MessageType.USER,
+                    chat_message.user_id, chat_message.context
+                )
+                response = await self._respond_from_cache(
+                    db, chat_message, user_conv, cached
+                )
+                yield _sse_frame({"type": "token", "content": response.response})
+                yield _sse_frame({
+                    "type": "done",
+                    "conversation_id": response.context["conversation_id"],
+                    "sources": response.sources,
+                    "cached": True
+                })
+                return
+
+        user_conv, knowledge_sources = await asyncio.gather(
+            self._save_message_own_session(
+                session_id, user_message, MessageType.USER,
+                chat_message.user_id, chat_message.context
+            ),
+            self.retrieve_relevant_knowledge(
+                db, user_message, query_embedding=query_embedding
+            )
+        )
+
+        # Reading memory history hits Redis through a synchronous
+        # client, so assemble the messages in a thread
+        memory = self.get_conversation_memory(session_id)
+        messages = await asyncio.to_thread(
+            self._build_messages, memory, knowledge_sources, user_message
+        )
+
+        ai_response_parts = []
+        async for chunk in self.chat_model.astream(messages):
+            token = chunk.content
+            if not token:
+                continue
+            ai_response_parts.append(token)
+            yield _sse_frame({"type": "token", "content": token})
+
+        ai_response = "".join(ai_response_parts)
+
+        # Finish the turn (memory + AI-message persistence) off the
+        # streaming path under a pre-allocated id
+        ai_conv_id = uuid.uuid4()
+        self._spawn(self._finalize_turn(
+            session_id, user_message, user_conv, ai_response,
+            len(knowledge_sources), ai_conv_id
+        ))
+
+        formatted_sources = [{
+            "id": source["id"],
+            "title": source["title"],
+            "category": source["category"],
+            "similarity_score": source["similarity_score"]
+        } for source in knowledge_sources]
+
+        if not bypass_cache:
+            await self.response_cache.put(
+                user_message, session_id, ai_response, formatted_sources,
+                query_embedding=query_embedding
+            )
+
+        logger.info("Chat message streamed",
+                   session_id=session_id,
+                   response_length=len(ai_response),
+                   sources_used=len(knowledge_sources))
+
+        yield _sse_frame({
+            "type": "done",
+            "conversation_id": str(ai_conv_id),
+            "sources": formatted_sources
+        })
+
     async def clear_conversation_memory(self, session_id: str) -> bool:
-        """Clear conversation memory for a session"""
+        """Clear conversation memory for a session
+
+        Clears both the local L1 entry and the shared Redis history, so
+        the session is gone from every worker, not just this one.
+        """
         try:
-            if session_id in self._conversation_memories:
+            existed = session_id in self._conversation_memories
+            if existed:
                 del self._conversation_memories[session_id]
+
+            client = redis_client.get_client()
+            deleted = await client.delete(f"{_REDIS_MEMORY_PREFIX}{session_id}")
+
+            if existed or deleted:
                 logger.info("Cleared conversation memory", session_id=session_id)
                 return True
             return False
@@ -284,5 +874,20 @@ Instructions:
             return False
     
     async def get_active_sessions(self) -> List[str]:
-        """Get list of active chat sessions"""
-        return list(self._conversation_memories.keys())
\ No newline at end of file
+        """Get list of active chat sessions across all workers"""
+        try:
+            client = redis_client.get_client()
+            sessions = []
+            async for key in client.scan_iter(match=f"{_REDIS_MEMORY_PREFIX}*"):
+                sessions.append(key.split(_REDIS_MEMORY_PREFIX, 1)[1])
+            return sessions
+        except Exception as e:
+            logger.warning("Failed to scan sessions in Redis, using local view",
+                          error=str(e))
+            return list(self._conversation_memories.keys())
+
+
+@lru_cache()
+def get_chat_service() -> ChatService:
+    """Singleton ChatService for dependency injection"""
+    return ChatService()
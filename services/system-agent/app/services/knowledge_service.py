@@ -1,10 +1,15 @@
 from typing import List, Optional, Dict, Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
+from chromadb.utils import embedding_functions
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, insert, update
 import structlog
 import uuid
+from functools import lru_cache
 
 from app.config import get_settings
 from app.models.database import KnowledgeBase
@@ -20,34 +25,155 @@ from app.models.schemas import (
 logger = structlog.get_logger()
 settings = get_settings()
 
+# Chroma write batching: pending adds are flushed in groups of up to
+# _ADD_BATCH_SIZE entries or after _ADD_BATCH_WAIT seconds, whichever
+# comes first
+_ADD_BATCH_SIZE = 64
+_ADD_BATCH_WAIT = 0.1
+
+# Metadata keys promoted to dedicated result fields; everything else is
+# passed through as extra metadata
+_METADATA_RESERVED = frozenset({"title", "category", "tags"})
+
+
+class _ChromaQueryBatcher:
+    """Coalesces concurrent vector searches into batched ChromaDB queries.
+
+    Searches arriving within a short window that share the same
+    (n_results, where) shape are grouped into a single collection.query()
+    call with multiple query texts, amortizing the per-call embedding
+    round-trip. Each caller awaits a future resolved with its own slice
+    of the batched result.
+    """
+
+    def __init__(self, collection_getter, runner, max_batch: int = 32, max_wait: float = 0.01):
+        self._get_collection = collection_getter
+        self._run = runner
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    async def query(
+        self,
+        query_text: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Submit a single search and await its slice of the batched result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        shape = (n_results, tuple(sorted(where.items())) if where else None)
+        await self._queue.put((shape, query_text, where, future))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self):
+        """Drain pending searches in batches of up to max_batch / max_wait"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = [self._queue.get_nowait()]
+            except asyncio.QueueEmpty:
+                return
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._execute_batch(batch)
+
+    async def _execute_batch(self, batch):
+        """Run one collection.query() per result shape and fan results out"""
+        groups: Dict[Any, list] = {}
+        for item in batch:
+            groups.setdefault(item[0], []).append(item)
+
+        for (n_results, _), items in groups.items():
+            futures = [item[3] for item in items]
+            try:
+                results = await self._run(
+                    self._get_collection().query,
+                    query_texts=[item[1] for item in items],
+                    n_results=n_results,
+                    where=items[0][2]
+                )
+                for i, future in enumerate(futures):
+                    if not future.done():
+                        future.set_result({
+                            key: [results[key][i]]
+                            for key in ("ids", "distances", "metadatas", "documents")
+                            if results.get(key)
+                        })
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
 
 class KnowledgeService:
     """Service for managing knowledge base and vector operations"""
-    
+
     def __init__(self):
         self.settings = settings
         self._chroma_client = None
         self._collection = None
-        
+        self._embedding_function = None
+        # Dedicated pool for blocking ChromaDB calls: embedding + HNSW
+        # work never runs on the event-loop thread
+        self._chroma_executor = ThreadPoolExecutor(
+            max_workers=settings.chroma_threads,
+            thread_name_prefix="chroma"
+        )
+        self._query_batcher = _ChromaQueryBatcher(
+            lambda: self.collection, self._run_chroma
+        )
+        self._pending_adds: asyncio.Queue = asyncio.Queue()
+        self._flusher_task: Optional[asyncio.Task] = None
+        # Bumped on every write so read-side caches keyed on it
+        # self-invalidate when the knowledge base changes
+        self.mutation_generation = 0
+
     @property
     def chroma_client(self):
-        """Lazy initialization of ChromaDB client"""
+        """Lazy initialization of the ChromaDB HTTP client
+
+        Talks to the shared Chroma server instead of holding the HNSW
+        index in-process: one index across all API workers (instead of a
+        copy per worker), documents embedded once on the server, and
+        per-call cost dominated by network RTT rather than local CPU.
+        """
         if self._chroma_client is None:
             try:
-                # Configure ChromaDB client
-                chroma_settings = ChromaSettings(
-                    persist_directory=self.settings.chromadb_persist_directory,
-                    allow_reset=True
+                self._chroma_client = chromadb.HttpClient(
+                    host=self.settings.chromadb_host,
+                    port=self.settings.chromadb_port,
+                    settings=ChromaSettings(anonymized_telemetry=False)
                 )
-                
-                self._chroma_client = chromadb.Client(chroma_settings)
-                logger.info("ChromaDB client initialized", 
-                           persist_dir=self.settings.chromadb_persist_directory)
+                logger.info("ChromaDB client initialized",
+                           host=self.settings.chromadb_host,
+                           port=self.settings.chromadb_port)
             except Exception as e:
                 logger.error("Failed to initialize ChromaDB client", error=str(e))
                 raise
         return self._chroma_client
     
+    @property
+    def embedding_function(self):
+        """Shared embedding function, also attached to the collection
+
+        Held explicitly so queries can embed once up front and reuse the
+        vector across searches instead of re-embedding per call.
+        """
+        if self._embedding_function is None:
+            self._embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        return self._embedding_function
+
     @property
     def collection(self):
         """Get or create the knowledge base collection"""
@@ -55,17 +181,109 @@ class KnowledgeService:
             try:
                 # Try to get existing collection
                 self._collection = self.chroma_client.get_collection(
-                    name="system_agent_knowledge"
+                    name="system_agent_knowledge",
+                    embedding_function=self.embedding_function
                 )
             except Exception:
                 # Create new collection if it doesn't exist
                 self._collection = self.chroma_client.create_collection(
                     name="system_agent_knowledge",
-                    metadata={"description": "System Agent Knowledge Base"}
+                    metadata={"description": "System Agent Knowledge Base"},
+                    embedding_function=self.embedding_function
                 )
                 logger.info("Created new ChromaDB collection: system_agent_knowledge")
         return self._collection
+
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text with the collection's embedding function
+
+        Blocking: callers on the event loop should run it via
+        asyncio.to_thread / _run_chroma so the forward pass stays off the
+        loop thread.
+        """
+        return list(self.embedding_function([text])[0])
     
+    async def _run_chroma(self, fn, *args, **kwargs):
+        """Run a blocking ChromaDB call on the dedicated thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._chroma_executor, lambda: fn(*args, **kwargs)
+        )
+
+    async def startup(self):
+        """Start the background vector-store write flusher"""
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._flush_pending_adds())
+            logger.info("Started ChromaDB write flusher")
+
+    async def shutdown(self):
+        """Stop the background vector-store write flusher"""
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            self._flusher_task = None
+
+    async def _add_to_vector_store(
+        self,
+        document: str,
+        metadata: Dict[str, Any],
+        embedding_id: str
+    ) -> None:
+        """Add one document to ChromaDB, batched through the flusher
+
+        Writes queued by concurrent requests are coalesced into a single
+        collection.add(), amortizing per-call embedding overhead and HNSW
+        insertion bookkeeping. Outside the API process (Celery workers,
+        scripts) the flusher is not running and the write goes straight
+        through.
+        """
+        if self._flusher_task is None or self._flusher_task.done():
+            await self._run_chroma(
+                self.collection.add,
+                documents=[document],
+                metadatas=[metadata],
+                ids=[embedding_id]
+            )
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        await self._pending_adds.put((document, metadata, embedding_id, future))
+        await future
+
+    async def _flush_pending_adds(self):
+        """Drain queued adds and write each batch with a single call"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending_adds.get()]
+            deadline = loop.time() + _ADD_BATCH_WAIT
+            while len(batch) < _ADD_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._pending_adds.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            futures = [item[3] for item in batch]
+            try:
+                await self._run_chroma(
+                    self.collection.add,
+                    documents=[item[0] for item in batch],
+                    metadatas=[item[1] for item in batch],
+                    ids=[item[2] for item in batch]
+                )
+                for future in futures:
+                    if not future.done():
+                        future.set_result(None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
     async def create_knowledge_entry(
         self, 
         db: AsyncSession, 
@@ -73,31 +291,37 @@ class KnowledgeService:
     ) -> KnowledgeBaseResponse:
         """Create a new knowledge base entry"""
         try:
-            # Create database entry
-            db_knowledge = KnowledgeBase(**knowledge_data.model_dump())
-            db.add(db_knowledge)
-            await db.flush()  # Get the ID
-            
-            # Create embedding and store in ChromaDB
-            embedding_id = str(db_knowledge.id)
-            
-            # Add to vector store
-            self.collection.add(
-                documents=[knowledge_data.content],
-                metadatas=[{
-                    "category": knowledge_data.category,
-                    "title": knowledge_data.title,
-                    "tags": knowledge_data.tags,
-                    **knowledge_data.metadata
-                }],
-                ids=[embedding_id]
-            )
-            
-            # Update database with embedding ID
-            db_knowledge.embedding_id = embedding_id
+            # Reserve ids client-side so there is a single statement and
+            # the vector-store id is known before the INSERT; RETURNING
+            # brings back the server-side timestamps without a refresh
+            row = knowledge_data.model_dump(by_alias=True)
+            row["id"] = uuid.uuid4()
+            row["embedding_id"] = str(row["id"])
+
+            stmt = insert(KnowledgeBase).values(**row).returning(KnowledgeBase)
+            db_knowledge = (await db.execute(stmt)).scalar_one()
             await db.commit()
-            await db.refresh(db_knowledge)
-            
+
+            # Postgres is the source of truth: the vector write happens
+            # after commit, and a failure is logged rather than aborting
+            # the already-committed entry. The next content update
+            # re-indexes it.
+            try:
+                await self._add_to_vector_store(
+                    knowledge_data.content,
+                    {
+                        "category": knowledge_data.category,
+                        "title": knowledge_data.title,
+                        "tags": knowledge_data.tags,
+                        **knowledge_data.metadata
+                    },
+                    db_knowledge.embedding_id
+                )
+            except Exception as e:
+                logger.warning("Failed to index knowledge entry in vector store",
+                              id=str(db_knowledge.id), error=str(e))
+
+            self.mutation_generation += 1
             logger.info("Created knowledge entry", 
                        id=str(db_knowledge.id), 
                        category=knowledge_data.category)
@@ -109,6 +333,66 @@ class KnowledgeService:
             logger.error("Failed to create knowledge entry", error=str(e))
             raise
     
+    async def bulk_create_knowledge_entries(
+        self,
+        db: AsyncSession,
+        items: List[KnowledgeBaseCreate]
+    ) -> List[KnowledgeBaseResponse]:
+        """Create multiple knowledge base entries in one batch
+
+        Uses SQLAlchemy's executemany/insertmanyvalues fast path for a
+        single multi-row INSERT and a single batched ChromaDB add, instead
+        of one round-trip per entry.
+        """
+        if not items:
+            return []
+
+        try:
+            # Reserve ids client-side so the vector-store ids are known
+            # before the INSERT
+            rows = []
+            for item in items:
+                row = item.model_dump(by_alias=True)
+                row["id"] = uuid.uuid4()
+                row["embedding_id"] = str(row["id"])
+                rows.append(row)
+
+            result = await db.execute(
+                insert(KnowledgeBase).returning(KnowledgeBase), rows
+            )
+            entries = result.scalars().all()
+
+            await db.commit()
+
+        except Exception as e:
+            await db.rollback()
+            logger.error("Failed to bulk create knowledge entries", error=str(e))
+            raise
+
+        # Postgres is the source of truth: the single batched vector-store
+        # write happens after the commit and must not fail the batch.
+        # Entries stay searchable via SQL until the embeddings backfill
+        try:
+            await self._run_chroma(
+                self.collection.add,
+                documents=[row["content"] for row in rows],
+                metadatas=[{
+                    "category": row["category"],
+                    "title": row["title"],
+                    "tags": row["tags"],
+                    **row["meta"]
+                } for row in rows],
+                ids=[row["embedding_id"] for row in rows]
+            )
+        except Exception as e:
+            logger.warning("Failed to add bulk entries to vector store",
+                          count=len(rows), error=str(e))
+
+        self.mutation_generation += 1
+        logger.info("Bulk created knowledge entries", count=len(entries))
+
+        return [KnowledgeBaseResponse.model_validate(entry) for entry in entries]
+
     async def get_knowledge_entry(
         self, 
         db: AsyncSession, 
@@ -138,37 +422,47 @@ class KnowledgeService:
     ) -> Optional[KnowledgeBaseResponse]:
         """Update a knowledge base entry"""
         try:
-            result = await db.execute(
-                select(KnowledgeBase).where(KnowledgeBase.id == entry_id)
+            update_dict = update_data.model_dump(exclude_unset=True, by_alias=True)
+            if not update_dict:
+                return await self.get_knowledge_entry(db, entry_id)
+
+            # Single round-trip: the UPDATE doubles as the existence check
+            # and RETURNING hands back the full updated row
+            stmt = (
+                update(KnowledgeBase)
+                .where(KnowledgeBase.id == entry_id)
+                .values(**update_dict)
+                .returning(KnowledgeBase)
             )
-            knowledge = result.scalar_one_or_none()
-            
-            if not knowledge:
+            knowledge = (await db.execute(stmt)).scalar_one_or_none()
+
+            if knowledge is None:
+                await db.rollback()
                 return None
-            
-            # Update database fields
-            update_dict = update_data.model_dump(exclude_unset=True)
-            for field, value in update_dict.items():
-                setattr(knowledge, field, value)
-            
-            # If content was updated, update the vector store
-            if "content" in update_dict:
-                if knowledge.embedding_id:
-                    # Update existing embedding
-                    self.collection.update(
+
+            await db.commit()
+
+            # If content was updated, re-index in the vector store; the
+            # committed row stays authoritative on indexing failure
+            if "content" in update_dict and knowledge.embedding_id:
+                try:
+                    await self._run_chroma(
+                        self.collection.update,
                         ids=[knowledge.embedding_id],
                         documents=[knowledge.content],
                         metadatas=[{
                             "category": knowledge.category,
                             "title": knowledge.title,
                             "tags": knowledge.tags,
-                            **knowledge.metadata
+                            **knowledge.meta
                         }]
                     )
-            
-            await db.commit()
-            await db.refresh(knowledge)
-            
+                except Exception as e:
+                    logger.warning("Failed to update vector store entry",
+                                  embedding_id=knowledge.embedding_id,
+                                  error=str(e))
+
+            self.mutation_generation += 1
             logger.info("Updated knowledge entry", 
                        id=str(entry_id), 
                        updated_fields=list(update_dict.keys()))
@@ -188,27 +482,35 @@ class KnowledgeService:
     ) -> bool:
         """Delete a knowledge base entry"""
         try:
-            result = await db.execute(
-                select(KnowledgeBase).where(KnowledgeBase.id == entry_id)
+            # Single round-trip: RETURNING the embedding id tells us both
+            # whether the row existed and whether a vector-store delete is
+            # needed, without a prior SELECT
+            stmt = (
+                delete(KnowledgeBase)
+                .where(KnowledgeBase.id == entry_id)
+                .returning(KnowledgeBase.embedding_id)
             )
-            knowledge = result.scalar_one_or_none()
-            
-            if not knowledge:
+            row = (await db.execute(stmt)).first()
+
+            if row is None:
+                await db.rollback()
                 return False
-            
+
+            await db.commit()
+
             # Remove from vector store
-            if knowledge.embedding_id:
+            embedding_id = row[0]
+            if embedding_id:
                 try:
-                    self.collection.delete(ids=[knowledge.embedding_id])
+                    await self._run_chroma(
+                        self.collection.delete, ids=[embedding_id]
+                    )
                 except Exception as e:
                     logger.warning("Failed to delete from vector store", 
-                                  embedding_id=knowledge.embedding_id, 
+                                  embedding_id=embedding_id, 
                                   error=str(e))
             
-            # Remove from database
-            await db.delete(knowledge)
-            await db.commit()
-            
+            self.mutation_generation += 1
             logger.info("Deleted knowledge entry", id=str(entry_id))
             return True
             
@@ -219,63 +521,100 @@ class KnowledgeService:
             raise
     
     async def search_knowledge(
-        self, 
-        db: AsyncSession, 
-        search_request: KnowledgeSearchRequest
+        self,
+        db: AsyncSession,
+        search_request: KnowledgeSearchRequest,
+        query_embedding: Optional[List[float]] = None
     ) -> KnowledgeSearchResponse:
         """Search knowledge base using vector similarity"""
+        return await self._search_internal(
+            db,
+            search_request.query,
+            search_request.limit,
+            search_request.similarity_threshold,
+            category=search_request.category,
+            query_embedding=query_embedding
+        )
+
+    async def _search_internal(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        similarity_threshold: float,
+        category: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> KnowledgeSearchResponse:
+        """Vector search taking plain arguments
+
+        In-process callers on the chat hot path use this directly so no
+        request model is constructed (and validated) per call; the API
+        wrapper above keeps the schema-typed entry point. Callers that
+        already hold an embedding of the query pass it as query_embedding
+        so the search skips the embedding forward pass entirely.
+        """
         try:
             # Prepare query filters
             where_filters = {}
-            if search_request.category:
-                where_filters["category"] = search_request.category
+            if category:
+                where_filters["category"] = category
             
-            # Perform vector search
-            search_results = self.collection.query(
-                query_texts=[search_request.query],
-                n_results=search_request.limit,
-                where=where_filters if where_filters else None
-            )
+            if query_embedding is not None:
+                search_results = await self._run_chroma(
+                    self.collection.query,
+                    query_embeddings=[query_embedding],
+                    n_results=limit,
+                    where=where_filters if where_filters else None
+                )
+            else:
+                # Perform vector search (batched with concurrent searches)
+                search_results = await self._query_batcher.query(
+                    query,
+                    limit,
+                    where_filters if where_filters else None
+                )
             
             results = []
-            if search_results["ids"] and search_results["ids"][0]:
-                for i, doc_id in enumerate(search_results["ids"][0]):
-                    distance = search_results["distances"][0][i]
-                    similarity_score = 1 - distance  # Convert distance to similarity
-                    
-                    # Skip results below threshold
-                    if similarity_score < search_request.similarity_threshold:
-                        continue
-                    
-                    # Get metadata
-                    metadata = search_results["metadatas"][0][i]
-                    document = search_results["documents"][0][i]
-                    
+            ids = search_results["ids"][0] if search_results["ids"] else []
+            if ids:
+                # Convert distances to similarities and threshold them in
+                # one vectorized pass; only surviving indices pay the
+                # per-result model construction below
+                distances = np.asarray(
+                    search_results["distances"][0], dtype=np.float32
+                )
+                similarities = 1.0 - distances
+                keep = np.nonzero(similarities >= similarity_threshold)[0]
+
+                metadatas = search_results["metadatas"][0]
+                documents = search_results["documents"][0]
+                for i in keep:
+                    metadata = metadatas[i]
                     result = KnowledgeSearchResult(
-                        id=uuid.UUID(doc_id),
+                        id=uuid.UUID(ids[i]),
                         title=metadata.get("title", ""),
-                        content=document,
+                        content=documents[i],
                         category=metadata.get("category", ""),
-                        similarity_score=similarity_score,
-                        metadata={k: v for k, v in metadata.items() 
-                                if k not in ["title", "category", "tags"]},
+                        similarity_score=float(similarities[i]),
+                        metadata={k: v for k, v in metadata.items()
+                                if k not in _METADATA_RESERVED},
                         tags=metadata.get("tags", [])
                     )
                     results.append(result)
             
             logger.info("Knowledge search completed", 
-                       query=search_request.query, 
+                       query=query, 
                        results_count=len(results))
             
             return KnowledgeSearchResponse(
-                query=search_request.query,
+                query=query,
                 results=results,
                 total_found=len(results)
             )
             
         except Exception as e:
             logger.error("Failed to search knowledge base", 
-                        query=search_request.query, error=str(e))
+                        query=query, error=str(e))
             raise
     
     async def get_knowledge_entries(
@@ -295,10 +634,19 @@ class KnowledgeService:
             query = query.offset(offset).limit(limit).order_by(KnowledgeBase.created_at.desc())
             
             result = await db.execute(query)
-            entries = result.scalars().all()
-            
-            return [KnowledgeBaseResponse.model_validate(entry) for entry in entries]
+
+            # Trusted rows from our own table: skip per-row validation
+            return [
+                KnowledgeBaseResponse.from_orm_trusted(entry)
+                for entry in result.scalars()
+            ]
             
         except Exception as e:
             logger.error("Failed to get knowledge entries", error=str(e))
-            raise
\ No newline at end of file
+            raise
+
+
+@lru_cache()
+def get_knowledge_service() -> KnowledgeService:
+    """Singleton KnowledgeService for dependency injection"""
+    return KnowledgeService()
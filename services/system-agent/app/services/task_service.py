@@ -1,9 +1,9 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from datetime import datetime, timedelta
+from sqlalchemy import select, and_, or_, bindparam, case, delete, func, insert, text, update
 import structlog
 import uuid
+from functools import lru_cache
 
 from app.config import get_settings
 from app.models.database import Task
@@ -18,6 +18,77 @@ from app.models.schemas import (
 logger = structlog.get_logger()
 settings = get_settings()
 
+# Column projection matching TaskResponse, resolved once at import time
+_TASK_COLUMNS = tuple(getattr(Task, name) for name in TaskResponse.model_fields)
+
+# Hot statements built once at import time: skips per-call Select
+# construction and gives SQLAlchemy's compiled-SQL cache a stable key.
+# Read paths use a column projection so Core row tuples skip ORM entity
+# hydration entirely
+_SELECT_TASK_ROW_BY_ID = (
+    select(*_TASK_COLUMNS).where(Task.id == bindparam("task_id"))
+)
+
+_SELECT_PENDING_TASKS = (
+    select(*_TASK_COLUMNS)
+    .where(
+        and_(
+            Task.status == TaskStatus.PENDING,
+            or_(
+                Task.scheduled_at.is_(None),
+                Task.scheduled_at <= func.now()  # DB clock, immune to worker skew
+            )
+        )
+    )
+    .order_by(
+        Task.priority.desc(),  # Higher priority first
+        Task.created_at.asc()  # Older tasks first for same priority
+    )
+    .limit(bindparam("limit"))
+)
+
+# Atomic claim: SELECT ... FOR UPDATE SKIP LOCKED picks rows no other
+# worker holds, and the wrapping UPDATE ... RETURNING marks them running
+# in the same round trip — lock-free work stealing between workers
+_CLAIMABLE_TASK_IDS = (
+    select(Task.id)
+    .where(
+        and_(
+            Task.status == TaskStatus.PENDING,
+            or_(
+                Task.scheduled_at.is_(None),
+                Task.scheduled_at <= func.now()  # DB clock, immune to worker skew
+            )
+        )
+    )
+    .order_by(Task.priority.desc(), Task.created_at.asc())
+    .limit(bindparam("limit"))
+    .with_for_update(skip_locked=True)
+)
+
+_CLAIM_PENDING_TASKS = (
+    update(Task)
+    .where(Task.id.in_(_CLAIMABLE_TASK_IDS.scalar_subquery()))
+    .values(
+        status=TaskStatus.RUNNING.value,
+        assigned_agent=bindparam("agent_id"),
+        started_at=func.coalesce(Task.started_at, func.now())
+    )
+    .returning(Task)
+)
+
+_SELECT_FAILED_RETRYABLE = (
+    select(*_TASK_COLUMNS)
+    .where(
+        and_(
+            Task.status == TaskStatus.FAILED,
+            Task.retry_count < Task.max_retries
+        )
+    )
+    .order_by(Task.priority.desc(), Task.updated_at.asc())
+    .limit(bindparam("limit"))
+)
+
 
 class TaskService:
     """Service for managing agent tasks"""
@@ -32,20 +103,25 @@ class TaskService:
     ) -> TaskResponse:
         """Create a new task"""
         try:
-            db_task = Task(
-                **task_data.model_dump(),
-                max_retries=self.settings.max_retries
+            # Single round-trip: RETURNING brings back the generated id
+            # and server-side defaults, so no refresh SELECT
+            stmt = (
+                insert(Task)
+                .values(
+                    **task_data.model_dump(),
+                    max_retries=self.settings.max_retries
+                )
+                .returning(Task)
             )
-            db.add(db_task)
+            db_task = (await db.execute(stmt)).scalar_one()
             await db.commit()
-            await db.refresh(db_task)
             
             logger.info("Created new task", 
                        task_id=str(db_task.id), 
                        task_type=task_data.task_type,
                        priority=task_data.priority)
             
-            return TaskResponse.model_validate(db_task)
+            return TaskResponse.from_orm_trusted(db_task)
             
         except Exception as e:
             await db.rollback()
@@ -60,12 +136,14 @@ class TaskService:
         """Get a task by ID"""
         try:
             result = await db.execute(
-                select(Task).where(Task.id == task_id)
+                _SELECT_TASK_ROW_BY_ID, {"task_id": task_id}
             )
-            task = result.scalar_one_or_none()
+            row = result.mappings().first()
             
-            if task:
-                return TaskResponse.model_validate(task)
+            if row:
+                # Trusted projection of our own columns: construct
+                # without re-validating
+                return TaskResponse.model_construct(**row)
             return None
             
         except Exception as e:
@@ -73,44 +151,70 @@ class TaskService:
                         task_id=str(task_id), error=str(e))
             raise
     
+    async def _apply_update_sql(
+        self,
+        db: AsyncSession,
+        task_id: uuid.UUID,
+        values: Dict[str, Any],
+        commit: bool = True
+    ) -> Optional[TaskResponse]:
+        """Apply a task update as one UPDATE ... RETURNING round trip
+
+        Shared tail for update_task and the mark_task_as_* transitions:
+        the single statement doubles as the existence check and returns
+        the updated row without a refresh SELECT. Callers batching
+        several transitions into one transaction pass commit=False and
+        commit once themselves.
+        """
+        stmt = (
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**values)
+            .returning(Task)
+        )
+        task = (await db.execute(stmt)).scalar_one_or_none()
+
+        if task is None:
+            if commit:
+                await db.rollback()
+            return None
+
+        if commit:
+            await db.commit()
+        return TaskResponse.from_orm_trusted(task)
+
     async def update_task(
-        self, 
-        db: AsyncSession, 
-        task_id: uuid.UUID, 
+        self,
+        db: AsyncSession,
+        task_id: uuid.UUID,
         update_data: TaskUpdate
     ) -> Optional[TaskResponse]:
         """Update a task"""
         try:
-            result = await db.execute(
-                select(Task).where(Task.id == task_id)
-            )
-            task = result.scalar_one_or_none()
-            
-            if not task:
-                return None
-            
-            # Update fields
             update_dict = update_data.model_dump(exclude_unset=True)
-            for field, value in update_dict.items():
-                setattr(task, field, value)
-            
-            # Set timestamps based on status changes
+            # No-op update: skip the UPDATE and above all its COMMIT,
+            # which still costs a WAL sync under synchronous commit
+            if not update_dict:
+                return await self.get_task(db, task_id)
+
+            # Set timestamps based on status changes; COALESCE keeps the
+            # first transition's timestamp on repeats
+            values = dict(update_dict)
             if "status" in update_dict:
-                if update_dict["status"] == TaskStatus.RUNNING and not task.started_at:
-                    task.started_at = datetime.utcnow()
+                if update_dict["status"] == TaskStatus.RUNNING:
+                    values["started_at"] = func.coalesce(Task.started_at, func.now())
                 elif update_dict["status"] in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
-                    if not task.completed_at:
-                        task.completed_at = datetime.utcnow()
-            
-            await db.commit()
-            await db.refresh(task)
-            
-            logger.info("Updated task", 
-                       task_id=str(task_id), 
-                       updated_fields=list(update_dict.keys()))
-            
-            return TaskResponse.model_validate(task)
-            
+                    values["completed_at"] = func.coalesce(Task.completed_at, func.now())
+
+            task = await self._apply_update_sql(db, task_id, values)
+
+            if task is not None:
+                logger.info("Updated task",
+                           task_id=str(task_id),
+                           updated_fields=list(update_dict.keys()))
+
+            return task
+
         except Exception as e:
             await db.rollback()
             logger.error("Failed to update task", 
@@ -124,17 +228,15 @@ class TaskService:
     ) -> bool:
         """Delete a task"""
         try:
+            # Single DELETE: rowcount doubles as the existence check
             result = await db.execute(
-                select(Task).where(Task.id == task_id)
+                delete(Task).where(Task.id == task_id)
             )
-            task = result.scalar_one_or_none()
+            await db.commit()
             
-            if not task:
+            if result.rowcount == 0:
                 return False
             
-            await db.delete(task)
-            await db.commit()
-            
             logger.info("Deleted task", task_id=str(task_id))
             return True
             
@@ -152,11 +254,16 @@ class TaskService:
         assigned_agent: Optional[str] = None,
         limit: int = 100,
         offset: int = 0
-    ) -> List[TaskResponse]:
-        """Get tasks with optional filtering"""
+    ) -> List[Dict[str, Any]]:
+        """Get tasks with optional filtering
+
+        Returns plain dicts built from a column projection — no ORM
+        entity hydration and no per-row Pydantic validation — so list
+        pages serialize straight through orjson.
+        """
         try:
-            query = select(Task)
-            
+            query = select(*_TASK_COLUMNS)
+
             # Apply filters
             conditions = []
             if status:
@@ -165,21 +272,50 @@ class TaskService:
                 conditions.append(Task.task_type == task_type)
             if assigned_agent:
                 conditions.append(Task.assigned_agent == assigned_agent)
-            
+
             if conditions:
                 query = query.where(and_(*conditions))
-            
+
             query = query.offset(offset).limit(limit).order_by(Task.created_at.desc())
-            
+
             result = await db.execute(query)
-            tasks = result.scalars().all()
-            
-            return [TaskResponse.model_validate(task) for task in tasks]
-            
+
+            return [dict(row) for row in result.mappings().all()]
+
         except Exception as e:
             logger.error("Failed to get tasks", error=str(e))
             raise
     
+    async def stream_tasks(
+        self,
+        db: AsyncSession,
+        status: Optional[TaskStatus] = None,
+        task_type: Optional[TaskType] = None,
+        assigned_agent: Optional[str] = None
+    ):
+        """Stream tasks from the database without materializing the full list
+
+        Returns an async iterator of Task rows fetched server-side, so
+        large exports keep peak memory flat.
+        """
+        query = select(Task)
+
+        conditions = []
+        if status:
+            conditions.append(Task.status == status)
+        if task_type:
+            conditions.append(Task.task_type == task_type)
+        if assigned_agent:
+            conditions.append(Task.assigned_agent == assigned_agent)
+
+        if conditions:
+            query = query.where(and_(*conditions))
+
+        query = query.order_by(Task.created_at.desc())
+
+        result = await db.stream(query)
+        return result.scalars()
+
     async def get_pending_tasks(
         self, 
         db: AsyncSession, 
@@ -187,30 +323,51 @@ class TaskService:
     ) -> List[TaskResponse]:
         """Get pending tasks ordered by priority and scheduled time"""
         try:
-            current_time = datetime.utcnow()
-            
-            query = select(Task).where(
-                and_(
-                    Task.status == TaskStatus.PENDING,
-                    or_(
-                        Task.scheduled_at.is_(None),
-                        Task.scheduled_at <= current_time
-                    )
-                )
-            ).order_by(
-                Task.priority.desc(),  # Higher priority first
-                Task.created_at.asc()   # Older tasks first for same priority
-            ).limit(limit)
-            
-            result = await db.execute(query)
-            tasks = result.scalars().all()
-            
-            return [TaskResponse.model_validate(task) for task in tasks]
+            result = await db.execute(
+                _SELECT_PENDING_TASKS, {"limit": limit}
+            )
+
+            return [
+                TaskResponse.model_construct(**row)
+                for row in result.mappings()
+            ]
             
         except Exception as e:
             logger.error("Failed to get pending tasks", error=str(e))
             raise
     
+    async def claim_pending_tasks(
+        self,
+        db: AsyncSession,
+        limit: int = 10,
+        agent_id: str = "system-agent"
+    ) -> List[TaskResponse]:
+        """Atomically claim pending tasks for a worker
+
+        Collapses poll + mark-running into one statement: the inner
+        SELECT takes row locks with SKIP LOCKED so concurrent workers
+        never contend over the same rows, and the UPDATE flips the
+        claimed rows to RUNNING before anyone else can see them.
+        """
+        try:
+            result = await db.execute(
+                _CLAIM_PENDING_TASKS,
+                {"limit": limit, "agent_id": agent_id}
+            )
+            tasks = result.scalars().all()
+            await db.commit()
+
+            if tasks:
+                logger.info("Claimed pending tasks",
+                           count=len(tasks), agent_id=agent_id)
+
+            return [TaskResponse.from_orm_trusted(task) for task in tasks]
+
+        except Exception as e:
+            await db.rollback()
+            logger.error("Failed to claim pending tasks", error=str(e))
+            raise
+
     async def get_failed_tasks_for_retry(
         self, 
         db: AsyncSession, 
@@ -218,20 +375,14 @@ class TaskService:
     ) -> List[TaskResponse]:
         """Get failed tasks that can be retried"""
         try:
-            query = select(Task).where(
-                and_(
-                    Task.status == TaskStatus.FAILED,
-                    Task.retry_count < Task.max_retries
-                )
-            ).order_by(
-                Task.priority.desc(),
-                Task.updated_at.asc()
-            ).limit(limit)
-            
-            result = await db.execute(query)
-            tasks = result.scalars().all()
-            
-            return [TaskResponse.model_validate(task) for task in tasks]
+            result = await db.execute(
+                _SELECT_FAILED_RETRYABLE, {"limit": limit}
+            )
+
+            return [
+                TaskResponse.model_construct(**row)
+                for row in result.mappings()
+            ]
             
         except Exception as e:
             logger.error("Failed to get failed tasks for retry", error=str(e))
@@ -241,94 +392,129 @@ class TaskService:
         self, 
         db: AsyncSession, 
         task_id: uuid.UUID, 
-        agent_id: str = "system-agent"
+        agent_id: str = "system-agent",
+        commit: bool = True
     ) -> Optional[TaskResponse]:
-        """Mark a task as running and assign to agent"""
-        update_data = TaskUpdate(
-            status=TaskStatus.RUNNING,
-            assigned_agent=agent_id
-        )
-        return await self.update_task(db, task_id, update_data)
+        """Mark a task as running and assign to agent
+
+        Single UPDATE ... RETURNING round-trip; started_at is only set on
+        the first transition via COALESCE.
+        """
+        try:
+            return await self._apply_update_sql(
+                db, task_id,
+                {
+                    "status": TaskStatus.RUNNING,
+                    "assigned_agent": agent_id,
+                    "started_at": func.coalesce(Task.started_at, func.now())
+                },
+                commit=commit
+            )
+
+        except Exception as e:
+            await db.rollback()
+            logger.error("Failed to mark task as running",
+                        task_id=str(task_id), error=str(e))
+            raise
     
     async def mark_task_as_completed(
         self, 
         db: AsyncSession, 
         task_id: uuid.UUID, 
-        result: Dict[str, Any]
+        result: Dict[str, Any],
+        commit: bool = True
     ) -> Optional[TaskResponse]:
         """Mark a task as completed with result"""
-        update_data = TaskUpdate(
-            status=TaskStatus.COMPLETED,
-            result=result
-        )
-        return await self.update_task(db, task_id, update_data)
+        try:
+            return await self._apply_update_sql(
+                db, task_id,
+                {
+                    "status": TaskStatus.COMPLETED,
+                    "result": result,
+                    "completed_at": func.coalesce(Task.completed_at, func.now())
+                },
+                commit=commit
+            )
+
+        except Exception as e:
+            await db.rollback()
+            logger.error("Failed to mark task as completed",
+                        task_id=str(task_id), error=str(e))
+            raise
     
     async def mark_task_as_failed(
         self, 
         db: AsyncSession, 
         task_id: uuid.UUID, 
         error_message: str,
-        increment_retry: bool = True
+        increment_retry: bool = True,
+        commit: bool = True
     ) -> Optional[TaskResponse]:
-        """Mark a task as failed with error message"""
+        """Mark a task as failed with error message
+
+        The retry decision runs in SQL: one atomic UPDATE increments the
+        retry count and flips the status to FAILED or back to PENDING
+        depending on max_retries, so concurrent workers cannot race the
+        counter through a read-modify-write.
+        """
         try:
-            result = await db.execute(
-                select(Task).where(Task.id == task_id)
-            )
-            task = result.scalar_one_or_none()
-            
-            if not task:
-                return None
-            
-            # Increment retry count if requested
-            if increment_retry:
-                task.retry_count += 1
-            
-            # Determine final status
-            if task.retry_count >= task.max_retries:
-                final_status = TaskStatus.FAILED
-            else:
-                final_status = TaskStatus.PENDING  # Will be retried
-            
-            update_data = TaskUpdate(
-                status=final_status,
-                error_message=error_message
+            new_retry = Task.retry_count + (1 if increment_retry else 0)
+            exhausted = new_retry >= Task.max_retries
+
+            return await self._apply_update_sql(
+                db, task_id,
+                {
+                    "retry_count": new_retry,
+                    "status": case(
+                        (exhausted, TaskStatus.FAILED.value),
+                        else_=TaskStatus.PENDING.value  # Will be retried
+                    ),
+                    "error_message": error_message,
+                    "completed_at": case(
+                        (exhausted, func.coalesce(Task.completed_at, func.now())),
+                        else_=Task.completed_at
+                    )
+                },
+                commit=commit
             )
-            
-            return await self.update_task(db, task_id, update_data)
-            
+
         except Exception as e:
+            await db.rollback()
             logger.error("Failed to mark task as failed", 
                         task_id=str(task_id), error=str(e))
             raise
     
     async def get_task_statistics(self, db: AsyncSession) -> Dict[str, Any]:
-        """Get task statistics"""
+        """Get task statistics
+
+        Three aggregate queries total: one GROUP BY per dimension plus a
+        scalar count for recent activity, instead of a COUNT round-trip
+        per enum value materializing full rows.
+        """
         try:
             # Count tasks by status
-            status_counts = {}
-            for status in TaskStatus:
-                result = await db.execute(
-                    select(Task).where(Task.status == status)
-                )
-                count = len(result.scalars().all())
-                status_counts[status.value] = count
+            status_counts = {status.value: 0 for status in TaskStatus}
+            result = await db.execute(
+                select(Task.status, func.count()).group_by(Task.status)
+            )
+            for status_value, count in result.all():
+                status_counts[status_value] = count
             
             # Count tasks by type
-            type_counts = {}
-            for task_type in TaskType:
-                result = await db.execute(
-                    select(Task).where(Task.task_type == task_type)
-                )
-                count = len(result.scalars().all())
-                type_counts[task_type.value] = count
+            type_counts = {task_type.value: 0 for task_type in TaskType}
+            result = await db.execute(
+                select(Task.task_type, func.count()).group_by(Task.task_type)
+            )
+            for type_value, count in result.all():
+                type_counts[type_value] = count
             
-            # Get recent activity (last 24 hours)
-            yesterday = datetime.utcnow() - timedelta(days=1)
+            # Get recent activity (last 24 hours), on the DB clock
             result = await db.execute(
-                select(Task).where(Task.created_at >= yesterday)
+                select(func.count()).where(
+                    Task.created_at >= func.now() - text("interval '1 day'")
+                )
             )
-            recent_tasks = len(result.scalars().all())
+            recent_tasks = result.scalar()
             
             return {
                 "status_counts": status_counts,
@@ -339,4 +525,10 @@ class TaskService:
             
         except Exception as e:
             logger.error("Failed to get task statistics", error=str(e))
-            raise
\ No newline at end of file
+            raise
+
+
+@lru_cache()
+def get_task_service() -> TaskService:
+    """Singleton TaskService for dependency injection"""
+    return TaskService()
@@ -3,27 +3,43 @@ import logging
 import sys
 from typing import Any
 
+import orjson
+
+# Output mode decided once at import: human-readable console for a TTY
+# (local development), orjson-to-bytes for everything else. isatty()
+# cannot change over the process lifetime, so there is nothing to
+# re-evaluate at configure or log time
+if sys.stdout.isatty():
+    _RENDERER = structlog.dev.ConsoleRenderer()
+    _LOGGER_FACTORY = structlog.WriteLoggerFactory()
+else:
+    # orjson serializes straight to bytes, so pair it with the bytes
+    # logger factory and keep the output path bytes end-to-end
+    _RENDERER = structlog.processors.JSONRenderer(serializer=orjson.dumps)
+    _LOGGER_FACTORY = structlog.BytesLoggerFactory()
+
 
 def configure_logging() -> None:
     """Configure structured logging for the application"""
-    
+
     # Configure standard library logging
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
         level=logging.INFO,
     )
-    
-    # Configure structlog
+
+    # Configure structlog; the filtering bound logger drops below-level
+    # calls before any argument formatting happens
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
             structlog.processors.add_log_level,
             structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer() if sys.stdout.isatty() else structlog.proc.JSONRenderer(),
+            _RENDERER,
         ],
         wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
-        logger_factory=structlog.WriteLoggerFactory(),
+        logger_factory=_LOGGER_FACTORY,
         cache_logger_on_first_use=True,
     )
 
@@ -33,19 +49,22 @@ def get_logger(name: str = None) -> structlog.BoundLogger:
     return structlog.get_logger(name)
 
 
+# Bound once at import: the helpers below run on every task and every
+# error, so skip the per-call get_logger() configuration walk
+_LOGGER = structlog.get_logger()
+
+
 def log_function_call(func_name: str, **kwargs: Any) -> None:
     """Log function call with parameters"""
-    logger = get_logger()
-    logger.info(f"Calling {func_name}", **kwargs)
+    _LOGGER.info(f"Calling {func_name}", **kwargs)
 
 
 def log_error(error: Exception, context: dict = None) -> None:
     """Log error with context"""
-    logger = get_logger()
     log_data = {
         "error_type": type(error).__name__,
         "error_message": str(error),
     }
     if context:
         log_data.update(context)
-    logger.error("Error occurred", **log_data)
\ No newline at end of file
+    _LOGGER.error("Error occurred", **log_data)
\ No newline at end of file
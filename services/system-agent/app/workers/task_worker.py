@@ -1,11 +1,17 @@
 from typing import Dict, Any
 import structlog
 import asyncio
+import hashlib
+import json
 from contextlib import asynccontextmanager
 
+from celery.signals import worker_process_init
+from pydantic import TypeAdapter
+
 from app.celery_app import celery_app
 from app.config import get_settings
 from app.db.database import AsyncSessionLocal
+from app.db.redis import cached
 from app.services.task_service import TaskService
 from app.services.chat_service import ChatService
 from app.services.knowledge_service import KnowledgeService
@@ -19,6 +25,54 @@ from app.models.schemas import (
 logger = structlog.get_logger()
 settings = get_settings()
 
+# Payload validators compiled once per worker process; validate_python
+# reuses the compiled core schema instead of re-resolving it per message
+_CHAT_ADAPTER = TypeAdapter(ChatMessage)
+_SEARCH_ADAPTER = TypeAdapter(KnowledgeSearchRequest)
+_KB_ADAPTER = TypeAdapter(KnowledgeBaseCreate)
+
+# Prompt templates built once at import; per-task cost is one .format
+# instead of re-parsing a multi-kilobyte f-string on every invocation
+_ANALYSIS_PROMPT = """\
+Perform a {analysis_type} analysis on the provided data.
+
+Data to analyze:
+{data}
+
+Context: {context}
+
+Please provide a structured analysis with key insights, findings, and recommendations.
+"""
+
+_REPORT_PROMPT = """\
+Generate a {report_type} report based on the provided data sources and parameters.
+
+Data Sources: {data_sources}
+Parameters: {parameters}
+
+Please create a comprehensive report with:
+1. Executive Summary
+2. Key Findings
+3. Detailed Analysis
+4. Recommendations
+5. Appendices (if needed)
+
+Format the report in a professional manner with clear sections and bullet points where appropriate.
+"""
+
+# Repeated LLM work in the workers is content-addressed: identical
+# inputs hit Redis instead of the model
+_LLM_CACHE_TTL = 86400  # 24 hours
+
+
+def _content_key(prefix: str, *parts: Any) -> str:
+    """Build a content-addressed cache key from the task inputs"""
+    digest = hashlib.blake2b(
+        json.dumps(parts, sort_keys=True, default=str).encode(),
+        digest_size=16
+    ).hexdigest()
+    return f"{prefix}:{digest}"
+
 
 @asynccontextmanager
 async def get_db_session():
@@ -34,14 +88,42 @@ async def get_db_session():
             await session.close()
 
 
+# One event loop per worker process: asyncpg connections (and the
+# SQLAlchemy pool holding them) are bound to a loop, so creating and
+# closing a loop per task would discard every pooled connection and
+# re-pay connect+auth on the next task
+_worker_loop = None
+
+
+@worker_process_init.connect
+def _init_worker_loop(**kwargs):
+    """Create the long-lived event loop when a worker process boots"""
+    global _worker_loop
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+
 def run_async_task(coro):
-    """Helper to run async functions in Celery tasks"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+    """Run a coroutine on the worker's persistent event loop"""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        # Outside a Celery worker (scripts, direct calls) create it lazily
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    result = _worker_loop.run_until_complete(coro)
+
+    # run_until_complete does not drain tasks spawned via create_task
+    # (e.g. ChatService's backgrounded turn finalization), so they would
+    # only run if a later Celery task spun the loop again — and be lost
+    # on worker shutdown. Fire-and-forget stays cheap on the API's
+    # always-running loop; here we finish the spawned work before
+    # returning
+    pending = asyncio.all_tasks(_worker_loop)
+    if pending:
+        _worker_loop.run_until_complete(
+            asyncio.gather(*pending, return_exceptions=True)
+        )
+    return result
 
 
 @celery_app.task(bind=True, name="process_chat_task")
@@ -50,41 +132,56 @@ def process_chat_task(self, task_id: str, payload: Dict[str, Any]):
     logger.info("Processing chat task", task_id=task_id)
     
     async def _process_chat():
-        try:
-            async with get_db_session() as db:
-                task_service = TaskService()
-                chat_service = ChatService()
-                
+        async with get_db_session() as db:
+            task_service = TaskService()
+            chat_service = ChatService()
+            try:
                 # Mark task as running
-                await task_service.mark_task_as_running(db, task_id, "celery-worker")
+                await task_service.mark_task_as_running(
+                    db, task_id, "celery-worker", commit=False
+                )
                 
                 # Create chat message from payload
-                chat_message = ChatMessage(**payload)
-                
-                # Process the chat message
-                chat_response = await chat_service.process_chat_message(db, chat_message)
-                
-                # Mark task as completed
-                result = {
-                    "response": chat_response.response,
-                    "session_id": chat_response.session_id,
-                    "sources_used": len(chat_response.sources),
-                    "context": chat_response.context
-                }
-                
-                await task_service.mark_task_as_completed(db, task_id, result)
+                chat_message = _CHAT_ADAPTER.validate_python(payload)
+
+                # Exact-match layer in front of the LLM: the same
+                # message in the same session returns the cached result.
+                # Near-duplicates are handled by the semantic response
+                # cache inside process_chat_message itself
+                async def _generate():
+                    chat_response = await chat_service.process_chat_message(db, chat_message)
+                    return {
+                        "response": chat_response.response,
+                        "session_id": chat_response.session_id,
+                        "sources_used": len(chat_response.sources),
+                        "context": chat_response.context
+                    }
+
+                result = await cached(
+                    _content_key("worker:chat", chat_message.session_id, chat_message.message),
+                    _LLM_CACHE_TTL,
+                    _generate
+                )
                 
+                await task_service.mark_task_as_completed(
+                    db, task_id, result, commit=False
+                )
+
+                # One commit covers running -> work -> completed
+                await db.commit()
+
                 logger.info("Chat task completed", task_id=task_id)
                 return result
-                
-        except Exception as e:
-            async with get_db_session() as db:
-                task_service = TaskService()
+
+            except Exception as e:
+                # Same session, same connection: roll back the
+                # open transaction and record the failure on it
+                await db.rollback()
                 await task_service.mark_task_as_failed(
                     db, task_id, f"Chat processing failed: {str(e)}"
                 )
-            logger.error("Chat task failed", task_id=task_id, error=str(e))
-            raise
+                logger.error("Chat task failed", task_id=task_id, error=str(e))
+                raise
     
     return run_async_task(_process_chat())
 
@@ -95,16 +192,17 @@ def process_knowledge_search_task(self, task_id: str, payload: Dict[str, Any]):
     logger.info("Processing knowledge search task", task_id=task_id)
     
     async def _process_knowledge_search():
-        try:
-            async with get_db_session() as db:
-                task_service = TaskService()
-                knowledge_service = KnowledgeService()
-                
+        async with get_db_session() as db:
+            task_service = TaskService()
+            knowledge_service = KnowledgeService()
+            try:
                 # Mark task as running
-                await task_service.mark_task_as_running(db, task_id, "celery-worker")
+                await task_service.mark_task_as_running(
+                    db, task_id, "celery-worker", commit=False
+                )
                 
                 # Create search request from payload
-                search_request = KnowledgeSearchRequest(**payload)
+                search_request = _SEARCH_ADAPTER.validate_python(payload)
                 
                 # Perform knowledge search
                 search_response = await knowledge_service.search_knowledge(
@@ -128,21 +226,27 @@ def process_knowledge_search_task(self, task_id: str, payload: Dict[str, Any]):
                     "total_found": search_response.total_found
                 }
                 
-                await task_service.mark_task_as_completed(db, task_id, result)
-                
+                await task_service.mark_task_as_completed(
+                    db, task_id, result, commit=False
+                )
+
+                # One commit covers running -> work -> completed
+                await db.commit()
+
                 logger.info("Knowledge search task completed", 
                            task_id=task_id, 
                            results_found=search_response.total_found)
                 return result
-                
-        except Exception as e:
-            async with get_db_session() as db:
-                task_service = TaskService()
+
+            except Exception as e:
+                # Same session, same connection: roll back the
+                # open transaction and record the failure on it
+                await db.rollback()
                 await task_service.mark_task_as_failed(
                     db, task_id, f"Knowledge search failed: {str(e)}"
                 )
-            logger.error("Knowledge search task failed", task_id=task_id, error=str(e))
-            raise
+                logger.error("Knowledge search task failed", task_id=task_id, error=str(e))
+                raise
     
     return run_async_task(_process_knowledge_search())
 
@@ -153,19 +257,20 @@ def process_knowledge_update_task(self, task_id: str, payload: Dict[str, Any]):
     logger.info("Processing knowledge update task", task_id=task_id)
     
     async def _process_knowledge_update():
-        try:
-            async with get_db_session() as db:
-                task_service = TaskService()
-                knowledge_service = KnowledgeService()
-                
+        async with get_db_session() as db:
+            task_service = TaskService()
+            knowledge_service = KnowledgeService()
+            try:
                 # Mark task as running
-                await task_service.mark_task_as_running(db, task_id, "celery-worker")
+                await task_service.mark_task_as_running(
+                    db, task_id, "celery-worker", commit=False
+                )
                 
                 operation = payload.get("operation", "create")
                 
                 if operation == "create":
                     # Create new knowledge entry
-                    knowledge_data = KnowledgeBaseCreate(**payload["data"])
+                    knowledge_data = _KB_ADAPTER.validate_python(payload["data"])
                     entry = await knowledge_service.create_knowledge_entry(
                         db, knowledge_data
                     )
@@ -204,21 +309,27 @@ def process_knowledge_update_task(self, task_id: str, payload: Dict[str, Any]):
                 else:
                     raise ValueError(f"Unknown operation: {operation}")
                 
-                await task_service.mark_task_as_completed(db, task_id, result)
-                
+                await task_service.mark_task_as_completed(
+                    db, task_id, result, commit=False
+                )
+
+                # One commit covers running -> work -> completed
+                await db.commit()
+
                 logger.info("Knowledge update task completed", 
                            task_id=task_id, 
                            operation=operation)
                 return result
-                
-        except Exception as e:
-            async with get_db_session() as db:
-                task_service = TaskService()
+
+            except Exception as e:
+                # Same session, same connection: roll back the
+                # open transaction and record the failure on it
+                await db.rollback()
                 await task_service.mark_task_as_failed(
                     db, task_id, f"Knowledge update failed: {str(e)}"
                 )
-            logger.error("Knowledge update task failed", task_id=task_id, error=str(e))
-            raise
+                logger.error("Knowledge update task failed", task_id=task_id, error=str(e))
+                raise
     
     return run_async_task(_process_knowledge_update())
 
@@ -229,60 +340,73 @@ def process_analysis_task(self, task_id: str, payload: Dict[str, Any]):
     logger.info("Processing analysis task", task_id=task_id)
     
     async def _process_analysis():
-        try:
-            async with get_db_session() as db:
-                task_service = TaskService()
-                chat_service = ChatService()
-                
+        async with get_db_session() as db:
+            task_service = TaskService()
+            chat_service = ChatService()
+            try:
                 # Mark task as running
-                await task_service.mark_task_as_running(db, task_id, "celery-worker")
+                await task_service.mark_task_as_running(
+                    db, task_id, "celery-worker", commit=False
+                )
                 
                 analysis_type = payload.get("analysis_type", "general")
                 data = payload.get("data", "")
                 context = payload.get("context", {})
-                
-                # Create a system message for analysis
-                system_prompt = f"""
-                Perform a {analysis_type} analysis on the provided data.
-                
-                Data to analyze:
-                {data}
-                
-                Context: {context}
-                
-                Please provide a structured analysis with key insights, findings, and recommendations.
-                """
-                
-                # Use chat service to generate analysis
-                chat_message = ChatMessage(
-                    message=system_prompt,
-                    session_id=f"analysis_{task_id}",
-                    context={"task_type": "analysis", "analysis_type": analysis_type}
+
+                system_prompt = _ANALYSIS_PROMPT.format(
+                    analysis_type=analysis_type,
+                    data=data,
+                    context=context
                 )
-                
-                chat_response = await chat_service.process_chat_message(db, chat_message)
-                
+
+                # Content-addressed: a repeated (analysis_type, data,
+                # context) triple returns the cached analysis without an
+                # LLM round trip
+                async def _generate():
+                    chat_message = ChatMessage(
+                        message=system_prompt,
+                        session_id=f"analysis_{task_id}",
+                        context={"task_type": "analysis", "analysis_type": analysis_type}
+                    )
+                    chat_response = await chat_service.process_chat_message(db, chat_message)
+                    return {
+                        "analysis": chat_response.response,
+                        "sources_consulted": len(chat_response.sources)
+                    }
+
+                generated = await cached(
+                    _content_key("analysis", analysis_type, data, context),
+                    _LLM_CACHE_TTL,
+                    _generate
+                )
+
                 # Mark task as completed
                 result = {
                     "analysis_type": analysis_type,
-                    "analysis": chat_response.response,
-                    "sources_consulted": len(chat_response.sources),
+                    "analysis": generated["analysis"],
+                    "sources_consulted": generated["sources_consulted"],
                     "context": context
                 }
                 
-                await task_service.mark_task_as_completed(db, task_id, result)
-                
+                await task_service.mark_task_as_completed(
+                    db, task_id, result, commit=False
+                )
+
+                # One commit covers running -> work -> completed
+                await db.commit()
+
                 logger.info("Analysis task completed", task_id=task_id, type=analysis_type)
                 return result
-                
-        except Exception as e:
-            async with get_db_session() as db:
-                task_service = TaskService()
+
+            except Exception as e:
+                # Same session, same connection: roll back the
+                # open transaction and record the failure on it
+                await db.rollback()
                 await task_service.mark_task_as_failed(
                     db, task_id, f"Analysis failed: {str(e)}"
                 )
-            logger.error("Analysis task failed", task_id=task_id, error=str(e))
-            raise
+                logger.error("Analysis task failed", task_id=task_id, error=str(e))
+                raise
     
     return run_async_task(_process_analysis())
 
@@ -293,84 +417,95 @@ def process_report_task(self, task_id: str, payload: Dict[str, Any]):
     logger.info("Processing report task", task_id=task_id)
     
     async def _process_report():
-        try:
-            async with get_db_session() as db:
-                task_service = TaskService()
-                chat_service = ChatService()
-                
+        async with get_db_session() as db:
+            task_service = TaskService()
+            chat_service = ChatService()
+            try:
                 # Mark task as running
-                await task_service.mark_task_as_running(db, task_id, "celery-worker")
+                await task_service.mark_task_as_running(
+                    db, task_id, "celery-worker", commit=False
+                )
                 
                 report_type = payload.get("report_type", "summary")
                 data_sources = payload.get("data_sources", [])
                 parameters = payload.get("parameters", {})
                 
-                # Create a system message for report generation
-                system_prompt = f"""
-                Generate a {report_type} report based on the provided data sources and parameters.
-                
-                Data Sources: {data_sources}
-                Parameters: {parameters}
-                
-                Please create a comprehensive report with:
-                1. Executive Summary
-                2. Key Findings
-                3. Detailed Analysis
-                4. Recommendations
-                5. Appendices (if needed)
-                
-                Format the report in a professional manner with clear sections and bullet points where appropriate.
-                """
-                
-                # Use chat service to generate report
-                chat_message = ChatMessage(
-                    message=system_prompt,
-                    session_id=f"report_{task_id}",
-                    context={"task_type": "report", "report_type": report_type}
+                system_prompt = _REPORT_PROMPT.format(
+                    report_type=report_type,
+                    data_sources=data_sources,
+                    parameters=parameters
                 )
                 
-                chat_response = await chat_service.process_chat_message(db, chat_message)
-                
+                # Content-addressed like the analysis task: a repeated
+                # (report_type, data_sources, parameters) triple returns
+                # the cached report without an LLM round trip
+                async def _generate():
+                    chat_message = ChatMessage(
+                        message=system_prompt,
+                        session_id=f"report_{task_id}",
+                        context={"task_type": "report", "report_type": report_type}
+                    )
+                    chat_response = await chat_service.process_chat_message(db, chat_message)
+                    return {
+                        "report": chat_response.response,
+                        "knowledge_sources_used": len(chat_response.sources)
+                    }
+
+                generated = await cached(
+                    _content_key("report", report_type, data_sources, parameters),
+                    _LLM_CACHE_TTL,
+                    _generate
+                )
+
                 # Mark task as completed
                 result = {
                     "report_type": report_type,
-                    "report": chat_response.response,
+                    "report": generated["report"],
                     "data_sources": data_sources,
                     "parameters": parameters,
-                    "knowledge_sources_used": len(chat_response.sources),
+                    "knowledge_sources_used": generated["knowledge_sources_used"],
                     "generated_at": str(asyncio.get_event_loop().time())
                 }
                 
-                await task_service.mark_task_as_completed(db, task_id, result)
-                
+                await task_service.mark_task_as_completed(
+                    db, task_id, result, commit=False
+                )
+
+                # One commit covers running -> work -> completed
+                await db.commit()
+
                 logger.info("Report task completed", task_id=task_id, type=report_type)
                 return result
-                
-        except Exception as e:
-            async with get_db_session() as db:
-                task_service = TaskService()
+
+            except Exception as e:
+                # Same session, same connection: roll back the
+                # open transaction and record the failure on it
+                await db.rollback()
                 await task_service.mark_task_as_failed(
                     db, task_id, f"Report generation failed: {str(e)}"
                 )
-            logger.error("Report task failed", task_id=task_id, error=str(e))
-            raise
+                logger.error("Report task failed", task_id=task_id, error=str(e))
+                raise
     
     return run_async_task(_process_report())
 
 
-# Task routing based on task type
+# Dispatch table built once at import time; per-call routing is a
+# C-level enum conversion plus one dict hit
+_ROUTE = {
+    TaskType.CHAT: process_chat_task,
+    TaskType.KNOWLEDGE_SEARCH: process_knowledge_search_task,
+    TaskType.KNOWLEDGE_UPDATE: process_knowledge_update_task,
+    TaskType.ANALYSIS: process_analysis_task,
+    TaskType.REPORT: process_report_task,
+}
+
+
 def route_task(task_type: str, task_id: str, payload: Dict[str, Any]):
     """Route task to appropriate worker function"""
-    task_map = {
-        TaskType.CHAT: process_chat_task,
-        TaskType.KNOWLEDGE_SEARCH: process_knowledge_search_task,
-        TaskType.KNOWLEDGE_UPDATE: process_knowledge_update_task,
-        TaskType.ANALYSIS: process_analysis_task,
-        TaskType.REPORT: process_report_task,
-    }
-    
-    worker_func = task_map.get(task_type)
-    if not worker_func:
+    try:
+        worker_func = _ROUTE[TaskType(task_type)]
+    except (ValueError, KeyError):
         raise ValueError(f"Unknown task type: {task_type}")
-    
+
     return worker_func.delay(task_id, payload)
\ No newline at end of file